@@ -1,9 +1,19 @@
 from abc import abstractmethod
-from dataclasses import dataclass, field
-from datetime import datetime
-from typing import Optional, List, Dict, Any
+from contextlib import nullcontext
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Any, Callable
+from functools import lru_cache
+from itertools import islice
+from operator import attrgetter
 from pathlib import Path
 import json
+import math
+import os
+import re
+import sys
 from decimal import Decimal
 from uuid import uuid4
 
@@ -104,7 +114,7 @@ class DatabaseError(CarRentalError):
         super().__init__(message)
 
 
-@dataclass
+@dataclass(slots=True)
 class AbstractUser:
     username: str
     password: str
@@ -127,7 +137,7 @@ class AbstractUser:
         raise NotImplementedError
 
 
-@dataclass
+@dataclass(slots=True)
 class Customer(AbstractUser):
     _balance: float = 0.0
     current_rental: Optional['Rental'] = None
@@ -141,8 +151,9 @@ class Customer(AbstractUser):
         return self._balance
 
     def add_balance(self, amount: float):
-        if amount <= 0:
-            raise ValueError("Amount must be positive")
+        # NaN and infinity pass a plain <= 0 check, and a NaN balance pays for any rental
+        if not math.isfinite(amount) or amount <= 0:
+            raise ValueError("Amount must be a positive, finite number")
         self._balance = round(self._balance + amount, 2)
 
     def deduct_balance(self, amount: float):
@@ -151,7 +162,7 @@ class Customer(AbstractUser):
         self._balance = round(self._balance - amount, 2)
 
 
-@dataclass
+@dataclass(slots=True)
 class Admin(AbstractUser):
     is_administrator: bool = field(default=True, init=False)
     
@@ -159,7 +170,7 @@ class Admin(AbstractUser):
         return "admin"
 
 
-@dataclass
+@dataclass(slots=True)
 class Vehicle:
     License_Plate: str
     make: str
@@ -170,34 +181,58 @@ class Vehicle:
     transmission: str
     fuel_type: str
     is_available: bool = True
+    # Removed from the fleet but kept in storage so its past rentals still resolve
+    retired: bool = False
 
     def __post_init__(self):
         if not (2000 <= self.year <= 2025):
             raise InvalidVehicleYearError(self.year)
+        # Categorical fields repeat across the fleet, so share one string object per value
+        self.make = sys.intern(self.make)
+        self.model = sys.intern(self.model)
+        self.transmission = sys.intern(self.transmission)
+        self.fuel_type = sys.intern(self.fuel_type)
 
 
-@dataclass
+@lru_cache(maxsize=4096)
+def _rental_cost(daily_rate: float, days: int) -> Decimal:
+    # Few distinct rate/duration pairs exist, and Decimals are immutable, so costs are shared
+    return Decimal(str(daily_rate)) * days
+
+
+@dataclass(slots=True)
 class Rental:
     user: Customer
     vehicle: Vehicle
     start_date: datetime
     end_date: datetime
     id: str = field(default_factory=lambda: str(uuid4()))
+    # Price frozen at booking, so later rate changes don't rewrite old invoices
+    daily_rate: Optional[float] = None
+    total_cost: Optional[Decimal] = None
+    duration_days: int = field(init=False)
 
     def __post_init__(self):
         if self.start_date >= self.end_date:
             raise InvalidRentalDurationError("End date must be after start date")
+        self.duration_days = (self.end_date - self.start_date).days
+        if self.daily_rate is None:
+            self.daily_rate = self.vehicle.daily_rate
+        if self.total_cost is None:
+            self.total_cost = _rental_cost(self.daily_rate, self.duration_days)
 
-    @property
-    def duration_days(self) -> int:
-        return (self.end_date - self.start_date).days
 
-    @property
-    def total_cost(self) -> Decimal:
-        return Decimal(str(self.vehicle.daily_rate)) * Decimal(str(self.duration_days))
+# Rentals start and end on a limited set of dates; sharing the parsed datetimes saves an object per field
+_parse_datetime = lru_cache(maxsize=4096)(datetime.fromisoformat)
+_parse_decimal = lru_cache(maxsize=4096)(Decimal)
+# Whitespace or JSON punctuation; a token with none of these after it may continue in the next chunk
+_TOKEN_BOUNDARY = re.compile(r'[\s,:\[\]{}"]')
 
 
 class Database:
+    # Subclasses that need durable writes fsync each file before returning
+    durable = False
+
     def __init__(self, system: 'CarRentalSystem', data_dir: str = 'data'):
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
@@ -207,20 +242,133 @@ class Database:
         self.rentals_file = self.data_dir / 'rentals.json'
 
     def load_users(self) -> List[AbstractUser]:
-        return self._load_entities(self.users_file, self._decode_user)
+        # Remember each customer's rental ids so load_rentals can relink them
+        self._rental_links: Dict[str, tuple] = {}
+
+        def decode(data: Dict) -> AbstractUser:
+            if data.get("type") == "Customer":
+                self._rental_links[data['username']] = (data.get('current_rental'), data.get('rental_history', []))
+            return self._decode_user(data)
+
+        return self._load_entities(self.users_file, decode)
 
     def load_vehicles(self) -> List[Vehicle]:
         return self._load_entities(self.vehicles_file, self._decode_vehicle)
 
     def load_rentals(self) -> List[Rental]:
-        return self._load_entities(self.rentals_file, self._decode_rental)
+        # Resolve references through maps built once per load instead of scanning per rental
+        users = {u.username: u for u in self.system.users if isinstance(u, Customer)}
+        vehicles = self._rental_vehicles()
+        rentals = self._load_entities(self.rentals_file, lambda data: self._decode_rental(data, users, vehicles))
+        self._relink_rentals(users, {r.id: r for r in rentals})
+        return rentals
+
+    def _rental_vehicles(self) -> Dict[str, Vehicle]:
+        # Rentals may reference retired vehicles as well as the current fleet
+        vehicles = {v.License_Plate: v for v in self.system.vehicles}
+        vehicles.update(self.system.retired_vehicles)
+        return vehicles
+
+    def save_snapshot(self, snapshot: 'StateSnapshot'):
+        self.save_all(snapshot.users, snapshot.vehicles + snapshot.retired_vehicles, snapshot.rentals)
+
+    def _relink_rentals(self, users: Dict[str, Customer], rentals: Dict[str, Rental]):
+        for username, (current_id, history_ids) in getattr(self, '_rental_links', {}).items():
+            user = users.get(username)
+            if not user:
+                continue
+            user.current_rental = rentals.get(current_id)
+            user.rental_history = [rentals[i] for i in history_ids if i in rentals]
+
+    def record(self, entry: Dict):
+        # Full-snapshot storage persists everything in save_all; journaling subclasses override this
+        pass
+
+    def record_many(self, entries: List[Dict]):
+        # Batched commits call this; journaling subclasses write the whole batch at once
+        for entry in entries:
+            self.record(entry)
+
+    def load_journal(self) -> List[Dict]:
+        return []
+
+    def load_rental_history(self, user: Customer, offset: int = 0, limit: Optional[int] = None) -> List[Rental]:
+        # Newest first; the JSON snapshot already holds every rental in memory
+        end = len(user.rental_history) - offset
+        start = 0 if limit is None else max(0, end - limit)
+        return user.rental_history[start:end][::-1] if end > 0 else []
 
     @staticmethod
     def _load_entities(path: Path, decoder):
         if not path.exists():
             return []
+        return [decoder(data) for data in Database._iter_records(path)]
+
+    @staticmethod
+    def _iter_records(path: Path, chunk_size: int = 1 << 16):
+        # Decode the top-level JSON array one element at a time so the full list of dicts never exists
+        decoder = json.JSONDecoder()
+        whitespace = ' \t\r\n'
+
+        def error(message: str) -> DatabaseError:
+            return DatabaseError(f"Failed to load {path.name}: {message}")
+
+        def cut_off(buffer: str, index: int) -> bool:
+            # Only a token running to the end of the buffer can be completed by reading more
+            return _TOKEN_BOUNDARY.search(buffer, index) is None
+
         with open(path) as f:
-            return [decoder(data) for data in json.load(f)]
+            buffer, pos, eof = f.read(chunk_size), 0, False
+            # Characters dropped from the front of the buffer, so errors report file offsets
+            offset = 0
+            # '[' before the array, 'first' right after it, 'value' after a comma,
+            # 'separator' after a value, 'end' after the closing bracket
+            expect = '['
+            while True:
+                while pos < len(buffer) and buffer[pos] in whitespace:
+                    pos += 1
+                if pos == len(buffer):
+                    if eof:
+                        if expect == 'end':
+                            return
+                        raise error("unexpected end of file")
+                    offset += len(buffer)
+                    buffer, pos = f.read(chunk_size), 0
+                    eof = not buffer
+                    continue
+                char = buffer[pos]
+                if expect == '[':
+                    if char != '[':
+                        raise error("expected a JSON array")
+                    expect, pos = 'first', pos + 1
+                elif expect == 'end':
+                    raise error(f"unexpected {char!r} after the closing ']'")
+                elif expect == 'separator':
+                    if char not in ',]':
+                        raise error(f"expected ',' or ']' after a record, found {char!r}")
+                    expect, pos = 'value' if char == ',' else 'end', pos + 1
+                elif char == ']' and expect == 'first':
+                    expect, pos = 'end', pos + 1
+                else:
+                    try:
+                        record, end = decoder.raw_decode(buffer, pos)
+                        # A value ending with the buffer (e.g. a number cut at "12.") may continue
+                        complete = eof or not cut_off(buffer, end)
+                    except json.JSONDecodeError as e:
+                        # Truncation shows up as a string running off the end or an error in the last token
+                        if eof or not (e.msg.startswith("Unterminated string") or cut_off(buffer, e.pos)):
+                            raise error(f"{e.msg} at character {offset + e.pos}")
+                        complete = False
+                    if not complete:
+                        # The record straddles the chunk boundary; read at least as much again and retry,
+                        # so a record spanning many chunks is only re-decoded a logarithmic number of times
+                        more = f.read(max(chunk_size, len(buffer) - pos))
+                        eof = not more
+                        offset += pos
+                        buffer, pos = buffer[pos:] + more, 0
+                        continue
+                    expect, pos = 'separator', end
+                    yield record
 
     def save_all(self, users: List[AbstractUser], vehicles: List[Vehicle], rentals: List[Rental]):
         self._save_entities(self.users_file, users, self._encode_user)
@@ -231,6 +379,9 @@ class Database:
         try:
             with open(path, 'w') as f:
                 json.dump([encoder(e) for e in entities], f, default=self._json_default, indent=2)
+                if self.durable:
+                    f.flush()
+                    os.fsync(f.fileno())
         except Exception as e:
             raise DatabaseError(f"Failed to save {path.name}: {str(e)}")
 
@@ -301,6 +452,10 @@ class Database:
             "fuel_type": vehicle.fuel_type,
             "is_available": vehicle.is_available
         }
+        # Only written for retired vehicles, so current vehicles encode as before
+        if vehicle.retired:
+            data["retired"] = True
+        return data
 
     @staticmethod
     def _decode_vehicle(data: Dict) -> Vehicle:
@@ -314,7 +469,8 @@ class Database:
             seating=data['seating'],
             transmission=data['transmission'],
             fuel_type=data['fuel_type'],
-            is_available=data['is_available']
+            is_available=data['is_available'],
+            retired=data.get('retired', False)
         )
 
     @staticmethod
@@ -324,40 +480,681 @@ class Database:
             "user": rental.user.username,
             "vehicle": rental.vehicle.License_Plate,
             "start_date": rental.start_date,
-            "end_date": rental.end_date
+            "end_date": rental.end_date,
+            "daily_rate": rental.daily_rate,
+            "total_cost": rental.total_cost
         }
 
-    def _decode_rental(self, data: Dict) -> Rental:
+    @staticmethod
+    def _decode_rental(data: Dict, users: Dict[str, Customer], vehicles: Dict[str, Vehicle]) -> Rental:
         try:
-            user = next(u for u in self.system.users if u.username == data['user'] and isinstance(u, Customer))
-            vehicle = next(v for v in self.system.vehicles if v.License_Plate == data['vehicle'])
-        except StopIteration:
+            user = users[data['user']]
+            vehicle = vehicles[data['vehicle']]
+        except KeyError:
             raise DatabaseError("Invalid rental reference")
 
         return Rental(
             user=user,
             vehicle=vehicle,
-            start_date=datetime.fromisoformat(data['start_date']),
-            end_date=datetime.fromisoformat(data['end_date']),
-            id=data['id']
+            start_date=_parse_datetime(data['start_date']),
+            end_date=_parse_datetime(data['end_date']),
+            id=data['id'],
+            # Rentals saved before prices were frozen fall back to the vehicle's current rate
+            daily_rate=data.get('daily_rate'),
+            total_cost=_parse_decimal(data['total_cost']) if data.get('total_cost') is not None else None
         )
 
 
-class CarRentalSystem:
+class AtomicDatabase(Database):
+    """Crash-safe snapshots: a save never overwrites the files a load could be reading.
+
+    save_all writes users/vehicles/rentals.<generation>.json, fsyncs them and then
+    atomically replaces manifest.json to point at the new generation. Loads follow
+    the manifest, so they see either the old or the new set, never a mix. Without a
+    manifest the plain users.json, vehicles.json and rentals.json are loaded.
+    """
+    durable = True
+    SNAPSHOT_PATTERN = re.compile(r'^(users|vehicles|rentals)\.(\d+)\.json$')
+
+    def __init__(self, system: 'CarRentalSystem', data_dir: str = 'data'):
+        super().__init__(system, data_dir)
+        self.manifest_file = self.data_dir / 'manifest.json'
+        self.generation = 0
+        if self.manifest_file.exists():
+            try:
+                with open(self.manifest_file) as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError) as e:
+                raise DatabaseError(f"Failed to read {self.manifest_file.name}: {str(e)}")
+            self.generation = manifest['generation']
+            self.users_file = self.data_dir / manifest['users']
+            self.vehicles_file = self.data_dir / manifest['vehicles']
+            self.rentals_file = self.data_dir / manifest['rentals']
+
+    def save_all(self, users: List[AbstractUser], vehicles: List[Vehicle], rentals: List[Rental]):
+        generation = self.generation + 1
+        users_file = self.data_dir / f'users.{generation}.json'
+        vehicles_file = self.data_dir / f'vehicles.{generation}.json'
+        rentals_file = self.data_dir / f'rentals.{generation}.json'
+        self._save_entities(users_file, users, self._encode_user)
+        self._save_entities(vehicles_file, vehicles, self._encode_vehicle)
+        self._save_entities(rentals_file, rentals, self._encode_rental)
+
+        manifest = {"generation": generation, "users": users_file.name,
+                    "vehicles": vehicles_file.name, "rentals": rentals_file.name}
+        temp_file = self.manifest_file.with_suffix('.json.tmp')
+        try:
+            with open(temp_file, 'w') as f:
+                json.dump(manifest, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_file, self.manifest_file)
+            self._fsync_dir()
+        except OSError as e:
+            raise DatabaseError(f"Failed to save {self.manifest_file.name}: {str(e)}")
+
+        self.generation = generation
+        self.users_file, self.vehicles_file, self.rentals_file = users_file, vehicles_file, rentals_file
+        self._remove_stale_snapshots()
+
+    def _fsync_dir(self):
+        # Make the rename itself durable; directories cannot be opened this way on Windows
+        if not hasattr(os, 'O_DIRECTORY'):
+            return
+        fd = os.open(self.data_dir, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _remove_stale_snapshots(self):
+        for path in self.data_dir.glob('*.*.json'):
+            match = self.SNAPSHOT_PATTERN.match(path.name)
+            if match and int(match.group(2)) != self.generation:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+
+class JournalDatabase(AtomicDatabase):
+    """Write-ahead journal on top of the atomic JSON snapshots.
+
+    Every mutation appends one compact line to journal.jsonl, so save_all only has to
+    flush the journal. Once compact_every records have accumulated a new snapshot
+    generation is written and switched in, and only then is the journal truncated.
+    Loading replays the journal tail on top of the snapshot.
+    """
+
+    def __init__(self, system: 'CarRentalSystem', data_dir: str = 'data', compact_every: int = 1000):
+        super().__init__(system, data_dir)
+        self.journal_file = self.data_dir / 'journal.jsonl'
+        self.compact_every = compact_every
+        self._journal = None
+        self._pending = 0
+
+    def load_journal(self) -> List[Dict]:
+        entries = []
+        if self.journal_file.exists():
+            with open(self.journal_file) as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        # A torn final line from a crash mid-append is dropped
+                        break
+        self._pending = len(entries)
+        return entries
+
+    def record(self, entry: Dict):
+        try:
+            if self._journal is None:
+                self._journal = open(self.journal_file, 'a')
+            self._journal.write(json.dumps(entry, default=self._json_default, separators=(',', ':')) + "\n")
+            self._journal.flush()
+        except Exception as e:
+            raise DatabaseError(f"Failed to append to {self.journal_file.name}: {str(e)}")
+        self._pending += 1
+        if self._pending >= self.compact_every:
+            self.compact()
+
+    def record_many(self, entries: List[Dict]):
+        if not entries:
+            return
+        try:
+            if self._journal is None:
+                self._journal = open(self.journal_file, 'a')
+            self._journal.write(''.join(json.dumps(entry, default=self._json_default, separators=(',', ':')) + "\n"
+                                        for entry in entries))
+            self._journal.flush()
+        except Exception as e:
+            raise DatabaseError(f"Failed to append to {self.journal_file.name}: {str(e)}")
+        self._pending += len(entries)
+        if self._pending >= self.compact_every:
+            self.compact()
+
+    def save_all(self, users: List[AbstractUser], vehicles: List[Vehicle], rentals: List[Rental]):
+        journal = self._journal
+        if journal is not None:
+            try:
+                os.fsync(journal.fileno())
+            except ValueError:
+                # Closed by a concurrent compaction, which already wrote everything to the snapshot
+                pass
+
+    def compact(self):
+        # Only the snapshot is taken under the state lock; encoding and writing happen outside it
+        snapshot = self.system.snapshot()
+        # Raises before the journal is touched if the new generation could not be switched in
+        super().save_all(snapshot.users, snapshot.vehicles + snapshot.retired_vehicles, snapshot.rentals)
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        # Replay is idempotent, so a crash before this truncation only replays records already in the snapshot
+        open(self.journal_file, 'w').close()
+        self._pending = 0
+
+
+class BookingCalendar:
+    """Unreturned bookings per vehicle, kept sorted by start date.
+
+    Bookings on one vehicle never overlap, so their end dates are sorted too and an
+    overlap check is a single bisect.
+    """
+
     def __init__(self):
-        self.db = Database(self)
+        self._starts: Dict[str, List[datetime]] = {}
+        self._bookings: Dict[str, List[Rental]] = {}
+
+    def add(self, rental: Rental):
+        plate = rental.vehicle.License_Plate
+        starts = self._starts.setdefault(plate, [])
+        index = bisect_left(starts, rental.start_date)
+        starts.insert(index, rental.start_date)
+        self._bookings.setdefault(plate, []).insert(index, rental)
+
+    def remove(self, rental: Rental):
+        plate = rental.vehicle.License_Plate
+        bookings = self._bookings.get(plate, [])
+        # Start dates are unique per vehicle because bookings never overlap
+        index = bisect_left(self._starts.get(plate, []), rental.start_date)
+        if index == len(bookings) or bookings[index] is not rental:
+            return
+        del bookings[index]
+        del self._starts[plate][index]
+        if not bookings:
+            del self._bookings[plate], self._starts[plate]
+
+    def is_free(self, License_Plate: str, start: datetime, end: datetime) -> bool:
+        starts = self._starts.get(License_Plate)
+        if not starts:
+            return True
+        # The last booking starting before `end` is the only one that can reach past `start`
+        index = bisect_left(starts, end)
+        return index == 0 or self._bookings[License_Plate][index - 1].end_date <= start
+
+    def has_bookings(self, License_Plate: str) -> bool:
+        return License_Plate in self._bookings
+
+    def bookings(self, License_Plate: str) -> List[Rental]:
+        return list(self._bookings.get(License_Plate, []))
+
+
+class ActiveRentals:
+    """Unreturned rentals ordered by end date, so due and overdue lookups are a bisect."""
+
+    def __init__(self, rentals: List[Rental] = ()):
+        ordered = sorted(rentals, key=lambda r: (r.end_date, r.id))
+        self._keys: List[tuple] = [(r.end_date, r.id) for r in ordered]
+        self._rentals: List[Rental] = ordered
+
+    def __len__(self) -> int:
+        return len(self._rentals)
+
+    def add(self, rental: Rental):
+        index = bisect_left(self._keys, (rental.end_date, rental.id))
+        self._keys.insert(index, (rental.end_date, rental.id))
+        self._rentals.insert(index, rental)
+
+    def remove(self, rental: Rental):
+        index = bisect_left(self._keys, (rental.end_date, rental.id))
+        if index < len(self._rentals) and self._rentals[index] is rental:
+            del self._keys[index], self._rentals[index]
+
+    def all(self) -> List[Rental]:
+        return list(self._rentals)
+
+    def copy(self) -> 'ActiveRentals':
+        other = ActiveRentals()
+        other._keys, other._rentals = list(self._keys), list(self._rentals)
+        return other
+
+    def ending_between(self, start: Optional[datetime], end: Optional[datetime]) -> List[Rental]:
+        # (date,) sorts before every (date, id), so bounds cover whole timestamps
+        low = 0 if start is None else bisect_left(self._keys, (start,))
+        high = len(self._keys) if end is None else bisect_left(self._keys, (end,))
+        return self._rentals[low:high]
+
+
+# Set bit positions of every byte value, for decoding bitmaps a byte at a time
+_BYTE_BITS = [tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256)]
+_NONZERO_BYTE = re.compile(b'[^\x00]')
+
+
+class VehicleIndex:
+    """Bitmap index over Vehicle fields plus sorted daily_rate and year lists.
+
+    Every vehicle owns a slot and every field value keeps an int bitmap of slots, so
+    combining filters is a few word-wise ANDs; a daily_rate or year range ORs the
+    bitmaps of the distinct values inside it. Results come back in sorted-field
+    order, either by decoding and sorting the matching slots or by walking the sorted
+    list until `limit` hits, whichever touches fewer vehicles.
+    """
+    CATEGORICAL = ('make', 'model', 'seating', 'transmission', 'fuel_type')
+    SORTED = ('daily_rate', 'year')
+    # Ranges covering more distinct values than this are checked per vehicle instead
+    MAX_RANGE_BITMAPS = 64
+
+    def __init__(self, vehicles: List[Vehicle] = ()):
+        self._slots: List[Optional[Vehicle]] = list(vehicles)
+        self._slot_of: Dict[str, int] = {v.License_Plate: i for i, v in enumerate(self._slots)}
+        self._free: List[int] = []
+        self._labels: Dict[str, Dict[Any, Any]] = {name: {} for name in self.CATEGORICAL + self.SORTED}
+        # Build bitmaps from byte arrays; OR-ing bits in one at a time is quadratic
+        self._bitmaps: Dict[str, Dict[Any, int]] = {}
+        size = len(self._slots) // 8 + 1
+        for name in self.CATEGORICAL + self.SORTED:
+            buffers: Dict[Any, bytearray] = {}
+            for slot, value in enumerate(map(attrgetter(name), self._slots)):
+                buffer = buffers.get(value)
+                if buffer is None:
+                    buffer = buffers[value] = bytearray(size)
+                buffer[slot >> 3] |= 1 << (slot & 7)
+            bitmaps = self._bitmaps[name] = {}
+            for value, buffer in buffers.items():
+                key = self._key(value)
+                self._labels[name].setdefault(key, value)
+                bitmaps[key] = bitmaps.get(key, 0) | int.from_bytes(buffer, 'little')
+        self._distinct: Dict[str, List] = {name: sorted(self._bitmaps[name]) for name in self.SORTED}
+        # Parallel lists of values and slots, ordered by (value, plate)
+        self._sorted_values: Dict[str, List] = {}
+        self._sorted_slots: Dict[str, List[int]] = {}
+        plates = [v.License_Plate for v in self._slots]
+        for name in self.SORTED:
+            values = list(map(attrgetter(name), self._slots))
+            order = sorted(range(len(plates)), key=plates.__getitem__)
+            order.sort(key=values.__getitem__)
+            self._sorted_slots[name] = order
+            self._sorted_values[name] = [values[slot] for slot in order]
+
+    @staticmethod
+    def _key(value):
+        return value.casefold() if isinstance(value, str) else value
+
+    def _position(self, name: str, vehicle: Vehicle) -> int:
+        # Index of vehicle in the sorted list, ties broken by plate
+        values, slots = self._sorted_values[name], self._sorted_slots[name]
+        value = getattr(vehicle, name)
+        return bisect_left(slots, vehicle.License_Plate, bisect_left(values, value), bisect_right(values, value),
+                           key=lambda slot: self._slots[slot].License_Plate)
+
+    def add(self, vehicle: Vehicle):
+        if self._free:
+            slot = self._free.pop()
+            self._slots[slot] = vehicle
+        else:
+            slot = len(self._slots)
+            self._slots.append(vehicle)
+        self._slot_of[vehicle.License_Plate] = slot
+        for name in self.CATEGORICAL + self.SORTED:
+            value = getattr(vehicle, name)
+            key = self._key(value)
+            if key not in self._bitmaps[name]:
+                self._labels[name][key] = value
+                if name in self._distinct:
+                    self._distinct[name].insert(bisect_left(self._distinct[name], key), key)
+            self._bitmaps[name][key] = self._bitmaps[name].get(key, 0) | (1 << slot)
+        for name in self.SORTED:
+            position = self._position(name, vehicle)
+            self._sorted_values[name].insert(position, getattr(vehicle, name))
+            self._sorted_slots[name].insert(position, slot)
+
+    def remove(self, vehicle: Vehicle):
+        slot = self._slot_of.pop(vehicle.License_Plate, None)
+        if slot is None:
+            return
+        for name in self.SORTED:
+            position = self._position(name, vehicle)
+            del self._sorted_values[name][position], self._sorted_slots[name][position]
+        for name in self.CATEGORICAL + self.SORTED:
+            key = self._key(getattr(vehicle, name))
+            bitmap = self._bitmaps[name][key] & ~(1 << slot)
+            if bitmap:
+                self._bitmaps[name][key] = bitmap
+                continue
+            del self._bitmaps[name][key], self._labels[name][key]
+            if name in self._distinct:
+                self._distinct[name].remove(key)
+        self._slots[slot] = None
+        self._free.append(slot)
+
+    def values(self, name: str) -> List:
+        """Distinct values of a field, as first entered."""
+        return sorted(self._labels[name].values(), key=self._key)
+
+    def _decode(self, mask: int) -> List[int]:
+        data = mask.to_bytes(mask.bit_length() // 8 + 1, 'little')
+        slots = []
+        for match in _NONZERO_BYTE.finditer(data):
+            base = match.start() << 3
+            slots.extend(base + bit for bit in _BYTE_BITS[data[match.start()]])
+        return slots
+
+    def query(self, filters: Optional[Dict[str, Any]] = None, ranges: Optional[Dict[str, tuple]] = None,
+              sort_by: str = 'daily_rate', descending: bool = False, limit: Optional[int] = None,
+              predicate: Optional[Callable[[Vehicle], bool]] = None) -> List[Vehicle]:
+        if sort_by not in self.SORTED:
+            raise ValueError(f"Cannot sort vehicles by {sort_by}")
+        mask = None
+        for name, value in (filters or {}).items():
+            if name not in self._bitmaps:
+                raise ValueError(f"Cannot filter vehicles by {name}")
+            if value is not None:
+                bitmap = self._bitmaps[name].get(self._key(value), 0)
+                mask = bitmap if mask is None else mask & bitmap
+
+        residual = {}
+        for name, (lower, upper) in (ranges or {}).items():
+            if lower is None and upper is None:
+                continue
+            keys = self._distinct[name]
+            first = 0 if lower is None else bisect_left(keys, lower)
+            last = len(keys) if upper is None else bisect_right(keys, upper)
+            if last - first > self.MAX_RANGE_BITMAPS:
+                residual[name] = (lower, upper)
+                continue
+            bitmap = 0
+            for key in keys[first:last]:
+                bitmap |= self._bitmaps[name][key]
+            mask = bitmap if mask is None else mask & bitmap
+
+        def matches(vehicle: Vehicle) -> bool:
+            for name, (lower, upper) in residual.items():
+                value = getattr(vehicle, name)
+                if (lower is not None and value < lower) or (upper is not None and value > upper):
+                    return False
+            return predicate is None or predicate(vehicle)
+
+        values, order = self._sorted_values[sort_by], self._sorted_slots[sort_by]
+        low, high = (ranges or {}).get(sort_by, (None, None))
+        start = 0 if low is None else bisect_left(values, low)
+        stop = len(values) if high is None else bisect_right(values, high)
+        span = max(stop - start, 0)
+        count = span if mask is None else mask.bit_count()
+        walk_cost = span if limit is None or not count else min(span, limit * len(values) // count)
+
+        if mask is not None and count <= walk_cost:
+            # Few matches: decode and sort them rather than walking the sorted list
+            found = [v for v in map(self._slots.__getitem__, self._decode(mask)) if matches(v)]
+            found.sort(key=lambda v: (getattr(v, sort_by), v.License_Plate), reverse=descending)
+            return found[:limit]
+
+        found = []
+        data = mask.to_bytes(len(self._slots) // 8 + 1, 'little') if mask is not None else None
+        positions = range(stop - 1, start - 1, -1) if descending else range(start, stop)
+        for position in positions:
+            slot = order[position]
+            if data is not None and not data[slot >> 3] >> (slot & 7) & 1:
+                continue
+            vehicle = self._slots[slot]
+            if matches(vehicle):
+                found.append(vehicle)
+                if limit is not None and len(found) >= limit:
+                    break
+        return found
+
+
+def _start_of_day(now: Optional[datetime] = None) -> datetime:
+    return datetime.combine((now or datetime.now()).date(), datetime.min.time())
+
+
+class _ListPrefix(Sequence):
+    """The first `length` items of an append-only list, which never change once written."""
+
+    def __init__(self, items: list, length: int):
+        self._items = items
+        self._length = length
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._items[:self._length][index]
+        if not -self._length <= index < self._length:
+            raise IndexError(index)
+        return self._items[index % self._length]
+
+    def __iter__(self):
+        return islice(self._items, self._length)
+
+
+def _detach(entity):
+    # Copy what changes after creation (balance, current rental, history, availability) for a snapshot
+    if isinstance(entity, Customer):
+        return replace(entity, rental_history=list(entity.rental_history))
+    if isinstance(entity, Vehicle):
+        return replace(entity)
+    return entity
+
+
+@dataclass(frozen=True)
+class StateSnapshot:
+    """Read-only view of a CarRentalSystem as of one version.
+
+    Readers can use it for as long as they like without holding any lock, and later
+    changes never show through its users, vehicles and available vehicles: those are
+    copies taken when each one last changed. Rentals never change once made, so they
+    are shared with the live system; their `user` and `vehicle` fields are the live
+    objects, so read balances and availability from the snapshot instead.
+    """
+    version: int
+    users: tuple
+    vehicles: tuple
+    rentals: Sequence
+    available: Dict[str, Vehicle]
+    active_rentals: ActiveRentals
+    # Removed vehicles that rentals still reference; they never change once retired
+    retired_vehicles: tuple
+
+    def get_active_rentals(self) -> List[Rental]:
+        return self.active_rentals.all()
+
+    def get_rentals_due_today(self, now: Optional[datetime] = None) -> List[Rental]:
+        today = _start_of_day(now)
+        return self.active_rentals.ending_between(today, today + timedelta(days=1))
+
+    def get_overdue_rentals(self, now: Optional[datetime] = None) -> List[Rental]:
+        return self.active_rentals.ending_between(None, _start_of_day(now))
+
+    def get_available_vehicles(self) -> List[Vehicle]:
+        return list(self.available.values())
+
+
+class CarRentalSystem:
+    def __init__(self, data_dir: str = 'data', db_class: type = Database):
+        self.db = db_class(self, data_dir)
         self.users: List[AbstractUser] = []
         self.vehicles: List[Vehicle] = []
         self.rentals: List[Rental] = []
+        # Removed vehicles, kept by plate so rentals of them still load
+        self.retired_vehicles: Dict[str, Vehicle] = {}
+        # Hash indexes kept alongside the lists so lookups are O(1)
+        self._users_by_name: Dict[str, AbstractUser] = {}
+        self._vehicles_by_plate: Dict[str, Vehicle] = {}
+        self._rentals_by_id: Dict[str, Rental] = {}
+        self._calendar = BookingCalendar()
+        self._active_rentals = ActiveRentals()
+        self._available: Dict[str, Vehicle] = {}
+        self._vehicle_index = VehicleIndex()
+        # Optional replacement for synchronous saves, e.g. a background persistence worker
+        self.on_save: Optional[Callable[[], None]] = None
+        # Held while snapshot() copies the state; a real lock once the system is shared between threads
+        self.state_lock = nullcontext()
+        # Bumped by every change; snapshot() rebuilds its cached view only when this moves
+        self.version = 0
+        self._snapshot: Optional[StateSnapshot] = None
+        # Snapshot copies of users and vehicles, built by the first snapshot() and then
+        # refreshed only for the keys marked by _changed(); dicts keep the list order
+        self._user_copies: Optional[Dict[str, AbstractUser]] = None
+        self._vehicle_copies: Dict[str, Vehicle] = {}
+        self._available_copies: Dict[str, Vehicle] = {}
+        self._changed_users: Dict[str, None] = {}
+        self._changed_vehicles: Dict[str, None] = {}
         self._load_data()
 
     def _load_data(self):
         self.users = self.db.load_users()
-        self.vehicles = self.db.load_vehicles()
+        self._users_by_name = {u.username: u for u in self.users}
+        vehicles = self.db.load_vehicles()
+        self.vehicles = [v for v in vehicles if not v.retired]
+        self.retired_vehicles = {v.License_Plate: v for v in vehicles if v.retired}
+        self._vehicles_by_plate = {v.License_Plate: v for v in self.vehicles}
+        self._vehicle_index = VehicleIndex(self.vehicles)
         self.rentals = self.db.load_rentals()
+        self._rentals_by_id = {r.id: r for r in self.rentals}
+        for entry in self.db.load_journal():
+            self._replay(entry)
+        # Unreturned rentals make up the booking calendar; is_available mirrors it
+        active = [u.current_rental for u in self.users if isinstance(u, Customer) and u.current_rental]
+        for rental in active:
+            self._calendar.add(rental)
+        self._active_rentals = ActiveRentals(active)
+        for vehicle in self.vehicles:
+            vehicle.is_available = not self._calendar.has_bookings(vehicle.License_Plate)
+        self._available = {v.License_Plate: v for v in self.vehicles if v.is_available}
+
+    def _replay(self, entry: Dict):
+        # Journal records carry resulting state, so applying one twice is harmless
+        op = entry['op']
+        if op == 'register' and entry['user']['username'] not in self._users_by_name:
+            user = self.db._decode_user(dict(entry['user']))
+            self.users.append(user)
+            self._users_by_name[user.username] = user
+        elif op == 'rent' and entry['rental']['id'] not in self._rentals_by_id:
+            customers = {entry['rental']['user']: self._get_customer(entry['rental']['user'])}
+            rental = self.db._decode_rental(entry['rental'], customers, self._vehicles_by_plate)
+            rental.user._balance = entry['balance']
+            rental.user.current_rental = rental
+            rental.vehicle.is_available = False
+            self.rentals.append(rental)
+            self._rentals_by_id[rental.id] = rental
+        elif op == 'return':
+            user = self._get_customer(entry['user'])
+            if user.current_rental and user.current_rental.id == entry['rental']:
+                user.rental_history.append(user.current_rental)
+                user.current_rental = None
+        elif op == 'add_funds':
+            self._get_customer(entry['user'])._balance = entry['balance']
+        elif op == 'add_vehicle' and entry['vehicle']['License_Plate'] not in self._vehicles_by_plate:
+            vehicle = self.db._decode_vehicle(entry['vehicle'])
+            self.retired_vehicles.pop(vehicle.License_Plate, None)
+            self.vehicles.append(vehicle)
+            self._vehicles_by_plate[vehicle.License_Plate] = vehicle
+            self._vehicle_index.add(vehicle)
+        elif op == 'remove_vehicle' and entry['License_Plate'] in self._vehicles_by_plate:
+            vehicle = self._vehicles_by_plate.pop(entry['License_Plate'])
+            self.vehicles.remove(vehicle)
+            self._vehicle_index.remove(vehicle)
+            self._retire(vehicle)
+
+    def _retire(self, vehicle: Vehicle):
+        # Kept, and saved with the fleet, so rentals of the vehicle still resolve on the next load
+        vehicle.is_available = False
+        vehicle.retired = True
+        self.retired_vehicles[vehicle.License_Plate] = vehicle
+
+    def _record(self, entry: Dict):
+        # Every mutation ends here once its in-memory change is complete
+        self.version += 1
+        self._store(entry)
+
+    def _store(self, entry: Dict):
+        self.db.record(entry)
+
+    def _changed(self, user: Optional[AbstractUser] = None, vehicle: Optional[Vehicle] = None):
+        # Nothing to refresh until a snapshot has been taken
+        if self._user_copies is None:
+            return
+        if user is not None:
+            self._changed_users[user.username] = None
+        if vehicle is not None:
+            # Moved to the end, like a vehicle put back into _available
+            self._changed_vehicles.pop(vehicle.License_Plate, None)
+            self._changed_vehicles[vehicle.License_Plate] = None
+
+    def _refresh_copies(self):
+        if self._user_copies is None:
+            self._user_copies = {u.username: _detach(u) for u in self.users}
+            self._vehicle_copies = {v.License_Plate: _detach(v) for v in self.vehicles}
+            self._available_copies = {plate: self._vehicle_copies[plate] for plate in self._available}
+            return
+        for username in self._changed_users:
+            self._user_copies[username] = _detach(self._users_by_name[username])
+        for plate in self._changed_vehicles:
+            self._available_copies.pop(plate, None)
+            vehicle = self._vehicles_by_plate.get(plate)
+            if vehicle is None:
+                self._vehicle_copies.pop(plate, None)
+                continue
+            copy = self._vehicle_copies[plate] = _detach(vehicle)
+            if plate in self._available:
+                self._available_copies[plate] = copy
+        self._changed_users.clear()
+        self._changed_vehicles.clear()
+
+    def snapshot(self) -> StateSnapshot:
+        """The current state as a StateSnapshot, shared by readers until the next change."""
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.version != self.version:
+            with self.state_lock:
+                snapshot = self._snapshot
+                if snapshot is None or snapshot.version != self.version:
+                    self._refresh_copies()
+                    snapshot = StateSnapshot(self.version, tuple(self._user_copies.values()),
+                                             tuple(self._vehicle_copies.values()),
+                                             _ListPrefix(self.rentals, len(self.rentals)),
+                                             dict(self._available_copies), self._active_rentals.copy(),
+                                             tuple(self.retired_vehicles.values()))
+                    self._snapshot = snapshot
+        return snapshot
+
+    def get_user(self, username: str) -> Optional[AbstractUser]:
+        return self._users_by_name.get(username)
+
+    def get_vehicle(self, License_Plate: str) -> Optional[Vehicle]:
+        return self._vehicles_by_plate.get(License_Plate)
+
+    def get_rental(self, rental_id: str) -> Optional[Rental]:
+        return self._rentals_by_id.get(rental_id)
+
+    def _get_customer(self, username: str) -> Customer:
+        user = self._users_by_name.get(username)
+        if not user or not isinstance(user, Customer):
+            raise InvalidUserError()
+        return user
+
+    def add_user(self, user: AbstractUser) -> AbstractUser:
+        if user.username in self._users_by_name:
+            raise UsernameExistsError(user.username)
+        self.users.append(user)
+        self._users_by_name[user.username] = user
+        self._changed(user=user)
+        self._record({"op": "register", "user": self.db._encode_user(user)})
+        return user
 
     def register_user(self, user_data: dict) -> Customer:
-        if any(u.username == user_data['username'] for u in self.users):
+        if user_data['username'] in self._users_by_name:
             raise UsernameExistsError(user_data['username'])
         
         # check for secret code
@@ -371,84 +1168,171 @@ class CarRentalSystem:
             user = Customer(**user_data)
 
         # save and return the user
-        self.users.append(user)
-        self.db.save_all(self.users, self.vehicles, self.rentals)
+        self.add_user(user)
+        self.save()
         return user
 
     def authenticate(self, username: str, password: str) -> AbstractUser:
-        user = next((u for u in self.users if u.username == username and u.password == password), None)
-        if not user:
+        user = self._users_by_name.get(username)
+        if not user or user.password != password:
             raise InvalidCredentialsError()
         return user
 
     def get_active_rentals(self) -> List[Rental]:
-        active = [r for r in self.rentals if not r.vehicle.is_available]
-        return active
+        """Unreturned rentals, soonest end date first."""
+        return self._active_rentals.all()
+
+    def get_rentals_due_today(self, now: Optional[datetime] = None) -> List[Rental]:
+        today = _start_of_day(now)
+        return self._active_rentals.ending_between(today, today + timedelta(days=1))
+
+    def get_overdue_rentals(self, now: Optional[datetime] = None) -> List[Rental]:
+        # Rentals whose end date is before today and still haven't been returned
+        return self._active_rentals.ending_between(None, _start_of_day(now))
 
     def rent_vehicle(self, username: str, License_Plate: str, start_date: datetime, end_date: datetime) -> Rental:
-        user = next((u for u in self.users if u.username == username), None)
-        vehicle = next((v for v in self.vehicles if v.License_Plate == License_Plate), None)
+        user = self._get_customer(username)
+        vehicle = self._vehicles_by_plate.get(License_Plate)
 
-        if not user or not isinstance(user, Customer):
-            raise InvalidUserError()
-        if not vehicle or not vehicle.is_available:
+        if not vehicle or not self._calendar.is_free(License_Plate, start_date, end_date):
             raise VehicleNotAvailableError(License_Plate)
         if user.current_rental:
             raise ActiveRentalExistsError(username)
 
         rental = Rental(user=user, vehicle=vehicle, start_date=start_date, end_date=end_date)
 
-        if user.balance < rental.total_cost:
-            raise InsufficientBalanceError(user.balance, float(rental.total_cost))
+        cost = float(rental.total_cost)
+        if user.balance < cost:
+            raise InsufficientBalanceError(user.balance, cost)
 
-        user.deduct_balance(float(rental.total_cost))
+        # The indexes compare dates and can raise, so they are updated before anything else changes
+        self._calendar.add(rental)
+        try:
+            self._active_rentals.add(rental)
+        except Exception:
+            self._calendar.remove(rental)
+            raise
+        user.deduct_balance(cost)
         vehicle.is_available = False
+        self._available.pop(License_Plate, None)
         user.current_rental = rental
         self.rentals.append(rental)
+        self._rentals_by_id[rental.id] = rental
+        self._changed(user=user, vehicle=vehicle)
+        self._record({"op": "rent", "rental": self.db._encode_rental(rental), "balance": user.balance})
         return rental
 
     def return_vehicle(self, username: str) -> None:
-        user = next((u for u in self.users if u.username == username), None)
-        if not user or not isinstance(user, Customer):
-            raise InvalidUserError()
+        user = self._get_customer(username)
         if not user.current_rental:
             raise NoActiveRentalError(username)
 
-        user.rental_history.append(user.current_rental)
-        user.current_rental.vehicle.is_available = True
+        rental = user.current_rental
+        user.rental_history.append(rental)
+        self._calendar.remove(rental)
+        self._active_rentals.remove(rental)
+        vehicle = rental.vehicle
+        vehicle.is_available = not self._calendar.has_bookings(vehicle.License_Plate)
+        if vehicle.is_available and vehicle.License_Plate in self._vehicles_by_plate:
+            self._available[vehicle.License_Plate] = vehicle
         user.current_rental = None
+        self._changed(user=user, vehicle=vehicle)
+        self._record({"op": "return", "user": username, "rental": rental.id})
 
     def add_vehicle(self, vehicle_data: Dict) -> Vehicle:
-        if any(v.License_Plate == vehicle_data['License_Plate'] for v in self.vehicles):
+        if vehicle_data['License_Plate'] in self._vehicles_by_plate:
             raise DuplicateVehicleError(vehicle_data['License_Plate'])
 
         vehicle = Vehicle(**vehicle_data)
+        # Re-adding a retired plate brings the car back; its old rentals resolve to the new record
+        self.retired_vehicles.pop(vehicle.License_Plate, None)
         self.vehicles.append(vehicle)
+        self._vehicles_by_plate[vehicle.License_Plate] = vehicle
+        self._vehicle_index.add(vehicle)
+        if vehicle.is_available:
+            self._available[vehicle.License_Plate] = vehicle
+        self._changed(vehicle=vehicle)
+        self._record({"op": "add_vehicle", "vehicle": self.db._encode_vehicle(vehicle)})
         return vehicle
 
     def remove_vehicle(self, License_Plate: str) -> None:
-        vehicle = next((v for v in self.vehicles if v.License_Plate == License_Plate), None)
+        vehicle = self._vehicles_by_plate.get(License_Plate)
         if not vehicle:
             raise VehicleNotFoundError(License_Plate)
         if not vehicle.is_available:
             raise VehicleNotAvailableError(License_Plate)
         self.vehicles.remove(vehicle)
+        del self._vehicles_by_plate[License_Plate]
+        self._vehicle_index.remove(vehicle)
+        self._available.pop(License_Plate, None)
+        self._retire(vehicle)
+        self._changed(vehicle=vehicle)
+        self._record({"op": "remove_vehicle", "License_Plate": License_Plate})
 
     def get_available_vehicles(self) -> List[Vehicle]:
-        return [v for v in self.vehicles if v.is_available]
+        return list(self._available.values())
+
+    def find_available(self, start: datetime, end: datetime, filters: Optional[Dict[str, Any]] = None) -> List[Vehicle]:
+        """Vehicles with no booking overlapping [start, end) whose fields equal every value in filters."""
+        return self.search_vehicles(filters, start=start, end=end)
+
+    def search_vehicles(self, filters: Optional[Dict[str, Any]] = None,
+                        min_rate: Optional[float] = None, max_rate: Optional[float] = None,
+                        min_year: Optional[int] = None, max_year: Optional[int] = None,
+                        sort_by: str = 'daily_rate', descending: bool = False, limit: Optional[int] = None,
+                        start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[Vehicle]:
+        """Available vehicles matching filters, sorted by daily_rate or year.
+
+        filters maps categorical fields (make, model, seating, transmission, fuel_type)
+        to a value; text matches ignore case. With start and end, vehicles free for that
+        range are returned instead of those with no bookings at all.
+        """
+        if start is not None and end is not None:
+            if start >= end:
+                raise InvalidRentalDurationError("End date must be after start date")
+            predicate = lambda v: self._calendar.is_free(v.License_Plate, start, end)
+        else:
+            predicate = lambda v: v.is_available
+        return self._vehicle_index.query(
+            filters, {'daily_rate': (min_rate, max_rate), 'year': (min_year, max_year)},
+            sort_by, descending, limit, predicate)
+
+    def get_vehicle_options(self, field_name: str) -> List:
+        return self._vehicle_index.values(field_name)
+
+    def get_vehicle_bookings(self, License_Plate: str) -> List[Rental]:
+        return self._calendar.bookings(License_Plate)
 
     def get_user_rental_history(self, username: str) -> List[Rental]:
-        user = next((u for u in self.users if u.username == username), None)
-        if not user or not isinstance(user, Customer):
-            raise InvalidUserError()
-        return user.rental_history
+        return self.db.load_rental_history(self._get_customer(username))[::-1]
+
+    def get_user_rental_history_page(self, username: str, offset: int = 0, limit: int = 20) -> List[Rental]:
+        return self.db.load_rental_history(self._get_customer(username), offset, limit)
 
     def add_funds(self, username: str, amount: float) -> float:
-        user = next((u for u in self.users if u.username == username), None)
-        if not user or not isinstance(user, Customer):
-            raise InvalidUserError()
+        user = self._get_customer(username)
         user.add_balance(amount)
+        self._changed(user=user)
+        self._record({"op": "add_funds", "user": username, "balance": user.balance})
         return user.balance
 
+    def charge(self, username: str, amount: float) -> float:
+        """Deduct a payment taken elsewhere, e.g. a booking made on another shard."""
+        user = self._get_customer(username)
+        user.deduct_balance(amount)
+        self._changed(user=user)
+        # Stored like a top-up: the record carries the resulting balance
+        self._record({"op": "add_funds", "user": username, "balance": user.balance})
+        return user.balance
+
+    def save(self):
+        if self.on_save:
+            self.on_save()
+        else:
+            self.db.save_all(self.users, self._stored_vehicles(), self.rentals)
+
     def shutdown(self):
-        self.db.save_all(self.users, self.vehicles, self.rentals)
\ No newline at end of file
+        self.db.save_all(self.users, self._stored_vehicles(), self.rentals)
+
+    def _stored_vehicles(self) -> List[Vehicle]:
+        return self.vehicles + list(self.retired_vehicles.values())
@@ -0,0 +1,88 @@
+from datetime import date, datetime
+from typing import List, Sequence, Tuple, Optional
+
+import numpy as np
+
+from Backend import CarRentalSystem, Rental, Vehicle
+
+EPOCH = datetime(1970, 1, 1)
+
+
+class RentalAnalytics:
+    """Rentals held as NumPy columns so reports are computed without Python loops.
+
+    Each rental becomes one row of plate index, user index, start/end epoch day and
+    daily rate in paisa. Aggregates are bincounts over those columns; money comes
+    back in rupees.
+    """
+
+    def __init__(self, rentals: Sequence[Rental], vehicles: Sequence[Vehicle]):
+        # Vehicles that were removed but still have rentals keep their own index
+        vehicle_by_plate = {v.License_Plate: v for v in vehicles}
+        for rental in rentals:
+            vehicle_by_plate.setdefault(rental.vehicle.License_Plate, rental.vehicle)
+        self.fleet_size = len(vehicles)
+        self.plates = list(vehicle_by_plate)
+        self.makes = [vehicle_by_plate[p].make for p in self.plates]
+        self.models = [vehicle_by_plate[p].model for p in self.plates]
+        plate_index = {plate: i for i, plate in enumerate(self.plates)}
+
+        self.usernames = sorted({r.user.username for r in rentals})
+        user_index = {name: i for i, name in enumerate(self.usernames)}
+
+        count = len(rentals)
+        self.plate_idx = np.fromiter((plate_index[r.vehicle.License_Plate] for r in rentals), np.int32, count)
+        self.user_idx = np.fromiter((user_index[r.user.username] for r in rentals), np.int32, count)
+        self.start_day = np.fromiter(((r.start_date - EPOCH).days for r in rentals), np.int32, count)
+        self.end_day = self.start_day + np.fromiter((r.duration_days for r in rentals), np.int32, count)
+        self.rate_paisa = np.fromiter((round(r.daily_rate * 100) for r in rentals), np.int64, count)
+        self.cost_paisa = self.rate_paisa * (self.end_day - self.start_day)
+
+    @classmethod
+    def from_system(cls, system: CarRentalSystem) -> 'RentalAnalytics':
+        # A snapshot lets the columns be built while bookings continue on other threads
+        snapshot = system.snapshot()
+        return cls(snapshot.rentals, snapshot.vehicles)
+
+    def total_revenue(self) -> float:
+        return int(self.cost_paisa.sum()) / 100
+
+    def average_duration(self) -> float:
+        return float((self.end_day - self.start_day).mean()) if len(self.start_day) else 0.0
+
+    def revenue_per_vehicle(self) -> List[Tuple[str, str, float]]:
+        revenue = np.bincount(self.plate_idx, weights=self.cost_paisa, minlength=len(self.plates))
+        order = np.argsort(-revenue, kind='stable')
+        return [(self.plates[i], f"{self.makes[i]} {self.models[i]}", float(revenue[i]) / 100) for i in order]
+
+    def revenue_per_make(self) -> List[Tuple[str, float]]:
+        makes, make_of_plate = np.unique(np.array([m.title() for m in self.makes], dtype=object),
+                                         return_inverse=True)
+        revenue = np.bincount(make_of_plate[self.plate_idx], weights=self.cost_paisa, minlength=len(makes))
+        order = np.argsort(-revenue, kind='stable')
+        return [(str(makes[i]), float(revenue[i]) / 100) for i in order]
+
+    def revenue_per_month(self) -> List[Tuple[str, float]]:
+        # Revenue is booked in the month the rental starts
+        months = self.start_day.astype('datetime64[D]').astype('datetime64[M]')
+        unique_months, month_idx = np.unique(months, return_inverse=True)
+        revenue = np.bincount(month_idx, weights=self.cost_paisa, minlength=len(unique_months))
+        return [(str(month), float(amount) / 100) for month, amount in zip(unique_months, revenue)]
+
+    def utilization(self, start: date, end: date) -> Tuple[float, List[Tuple[str, float]]]:
+        """Share of days in [start, end) each vehicle was rented, plus the fleet-wide share."""
+        window_start = (start - EPOCH.date()).days
+        window_end = (end - EPOCH.date()).days
+        days = max(window_end - window_start, 1)
+        overlap = np.clip(np.minimum(self.end_day, window_end) - np.maximum(self.start_day, window_start), 0, None)
+        rented = np.bincount(self.plate_idx, weights=overlap, minlength=len(self.plates))
+        per_vehicle = np.minimum(rented / days, 1.0)
+        fleet = float(per_vehicle[:self.fleet_size].mean()) if self.fleet_size else 0.0
+        order = np.argsort(-per_vehicle[:self.fleet_size], kind='stable')
+        return fleet, [(self.plates[i], float(per_vehicle[i])) for i in order]
+
+    def busiest_customers(self, limit: Optional[int] = 10) -> List[Tuple[str, int, float]]:
+        rentals = np.bincount(self.user_idx, minlength=len(self.usernames))
+        spend = np.bincount(self.user_idx, weights=self.cost_paisa, minlength=len(self.usernames))
+        order = np.argsort(-spend, kind='stable')[:limit]
+        return [(self.usernames[i], int(rentals[i]), float(spend[i]) / 100) for i in order]
@@ -0,0 +1,365 @@
+import argparse
+import asyncio
+import json
+import math
+import secrets
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from Backend import (ActiveRentalExistsError, Admin, AuthenticationError, CarRentalError, Database,
+                     DatabaseError, DuplicateVehicleError, InvalidUserError, JournalDatabase, PaymentError,
+                     UsernameExistsError, VehicleNotAvailableError, VehicleNotFoundError)
+from concurrent_system import ThreadSafeCarRentalSystem
+
+# Most specific first; anything else derived from CarRentalError is a 400
+ERROR_STATUS = [
+    (AuthenticationError, HTTPStatus.UNAUTHORIZED),
+    ((VehicleNotFoundError, InvalidUserError), HTTPStatus.NOT_FOUND),
+    ((VehicleNotAvailableError, ActiveRentalExistsError, DuplicateVehicleError, UsernameExistsError),
+     HTTPStatus.CONFLICT),
+    (PaymentError, HTTPStatus.PAYMENT_REQUIRED),
+    (DatabaseError, HTTPStatus.INTERNAL_SERVER_ERROR),
+]
+
+
+class ApiError(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class LatencyMetrics:
+    """Request counts and latency percentiles per route, over the most recent samples."""
+
+    def __init__(self, window: int = 10_000):
+        self.window = window
+        self.lock = threading.Lock()
+        self.samples: Dict[str, deque] = {}
+        self.counts: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+
+    def observe(self, route: str, seconds: float, failed: bool):
+        with self.lock:
+            self.samples.setdefault(route, deque(maxlen=self.window)).append(seconds)
+            self.counts[route] = self.counts.get(route, 0) + 1
+            self.errors[route] = self.errors.get(route, 0) + failed
+
+    def report(self) -> Dict:
+        with self.lock:
+            samples = {route: sorted(values) for route, values in self.samples.items()}
+            counts, errors = dict(self.counts), dict(self.errors)
+        report = {}
+        for route, values in samples.items():
+            def percentile(p):
+                return round(values[min(int(p * len(values)), len(values) - 1)] * 1000, 3)
+            report[route] = {"count": counts[route], "errors": errors[route],
+                             "mean_ms": round(sum(values) / len(values) * 1000, 3),
+                             "p50_ms": percentile(0.50), "p95_ms": percentile(0.95),
+                             "p99_ms": percentile(0.99), "max_ms": round(values[-1] * 1000, 3)}
+        return report
+
+
+class RentalApi:
+    """Transport-independent JSON API over a shared ThreadSafeCarRentalSystem.
+
+    POST /login exchanges credentials for a bearer token that lasts session_ttl
+    seconds. Every other route needs `Authorization: Bearer <token>`, and
+    inventory changes need an admin token.
+    """
+
+    def __init__(self, system: ThreadSafeCarRentalSystem, session_ttl: float = 3600.0):
+        self.system = system
+        self.session_ttl = session_ttl
+        # token -> (username, monotonic expiry time)
+        self.sessions: Dict[str, Tuple[str, float]] = {}
+        self._next_sweep = 0.0
+        self.metrics = LatencyMetrics()
+        self.address: Optional[Tuple[str, int]] = None
+        self.routes = {
+            ("POST", "/login"): self.login,
+            ("GET", "/vehicles/available"): self.available_vehicles,
+            ("POST", "/rentals"): self.rent_vehicle,
+            ("POST", "/rentals/return"): self.return_vehicle,
+            ("POST", "/funds"): self.add_funds,
+            ("GET", "/vehicles"): self.all_vehicles,
+            ("POST", "/vehicles"): self.add_vehicle,
+            ("DELETE", "/vehicles"): self.remove_vehicle,
+            ("GET", "/rentals/active"): self.active_rentals,
+            ("GET", "/metrics"): self.report_metrics,
+        }
+
+    def handle(self, method: str, target: str, headers, body: bytes) -> Tuple[int, Dict]:
+        url = urlsplit(target)
+        path, plate = url.path.rstrip('/'), ''
+        # /vehicles/<plate> addresses one vehicle; the route table holds the collection
+        if path.startswith('/vehicles/') and path != '/vehicles/available':
+            path, plate = '/vehicles', unquote(path[len('/vehicles/'):])
+        route = (method, path)
+        started = time.perf_counter()
+        status = HTTPStatus.OK
+        try:
+            handler = self.routes.get(route)
+            if handler is None:
+                raise ApiError(HTTPStatus.NOT_FOUND, f"No route for {method} {url.path}")
+            request = {"query": {k: v[-1] for k, v in parse_qs(url.query).items()}, "plate": plate,
+                       "headers": headers, "json": json.loads(body) if body else {}}
+            payload = handler(request)
+        except ApiError as e:
+            status, payload = e.status, {"error": str(e)}
+        except CarRentalError as e:
+            status = next((code for kinds, code in ERROR_STATUS if isinstance(e, kinds)), HTTPStatus.BAD_REQUEST)
+            payload = {"error": str(e)}
+        except (ValueError, KeyError, TypeError) as e:
+            status, payload = HTTPStatus.BAD_REQUEST, {"error": f"Invalid request: {e}"}
+        self.metrics.observe(f"{route[0]} {route[1]}", time.perf_counter() - started, status >= 400)
+        return status, payload
+
+    def _user(self, request, admin: bool = False):
+        scheme, _, token = request["headers"].get("Authorization", "").partition(" ")
+        username, expires = self.sessions.get(token, (None, 0.0)) if scheme == "Bearer" else (None, 0.0)
+        if username and expires <= time.monotonic():
+            self.sessions.pop(token, None)
+            username = None
+        user = self.system.get_user(username) if username else None
+        if user is None:
+            raise ApiError(HTTPStatus.UNAUTHORIZED, "Missing or expired token")
+        if admin and not isinstance(user, Admin):
+            raise ApiError(HTTPStatus.FORBIDDEN, "Admin access required")
+        return user
+
+    @staticmethod
+    def _vehicle(vehicle) -> Dict:
+        return Database._encode_vehicle(vehicle)
+
+    @staticmethod
+    def _date(value: str) -> datetime:
+        # The backend stores and compares naive local times; an offset would not compare with them
+        date = datetime.fromisoformat(value)
+        if date.tzinfo is not None:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"Dates must not carry a UTC offset: {value}")
+        return date
+
+    @staticmethod
+    def _rental(rental) -> Dict:
+        data = Database._encode_rental(rental)
+        data.update(start_date=rental.start_date.isoformat(), end_date=rental.end_date.isoformat(),
+                    total_cost=str(rental.total_cost), duration_days=rental.duration_days)
+        return data
+
+    def login(self, request) -> Dict:
+        user = self.system.authenticate(request["json"]["username"], request["json"]["password"])
+        token = secrets.token_urlsafe(24)
+        now = time.monotonic()
+        if now >= self._next_sweep:
+            # Tokens are only checked when used, so abandoned ones are dropped here once per TTL
+            self._next_sweep = now + self.session_ttl
+            for expired, (_, expires) in list(self.sessions.items()):
+                if expires <= now:
+                    self.sessions.pop(expired, None)
+        self.sessions[token] = (user.username, now + self.session_ttl)
+        return {"token": token, "role": user.get_role(), "expires_in": self.session_ttl}
+
+    def available_vehicles(self, request) -> Dict:
+        self._user(request)
+        query = request["query"]
+        if "start" in query and "end" in query:
+            vehicles = self.system.find_available(self._date(query["start"]), self._date(query["end"]))
+        else:
+            vehicles = self.system.get_available_vehicles()
+        return {"vehicles": [self._vehicle(v) for v in vehicles]}
+
+    def rent_vehicle(self, request) -> Dict:
+        user, data = self._user(request), request["json"]
+        rental = self.system.rent_vehicle(user.username, data["License_Plate"],
+                                          self._date(data["start_date"]), self._date(data["end_date"]))
+        return {"rental": self._rental(rental), "balance": user.balance}
+
+    def return_vehicle(self, request) -> Dict:
+        user = self._user(request)
+        self.system.return_vehicle(user.username)
+        return {"returned": True}
+
+    def add_funds(self, request) -> Dict:
+        user = self._user(request)
+        amount = float(request["json"]["amount"])
+        if not math.isfinite(amount) or amount <= 0:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Amount must be a positive, finite number")
+        return {"balance": self.system.add_funds(user.username, amount)}
+
+    def all_vehicles(self, request) -> Dict:
+        self._user(request, admin=True)
+        return {"vehicles": [self._vehicle(v) for v in self.system.snapshot().vehicles]}
+
+    def add_vehicle(self, request) -> Dict:
+        self._user(request, admin=True)
+        fields = ("License_Plate", "make", "model", "year", "daily_rate", "seating", "transmission", "fuel_type")
+        vehicle = self.system.add_vehicle({name: request["json"][name] for name in fields})
+        return {"vehicle": self._vehicle(vehicle)}
+
+    def remove_vehicle(self, request) -> Dict:
+        self._user(request, admin=True)
+        if not request["plate"]:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "DELETE needs /vehicles/<License_Plate>")
+        self.system.remove_vehicle(request["plate"])
+        return {"removed": request["plate"]}
+
+    def active_rentals(self, request) -> Dict:
+        self._user(request, admin=True)
+        return {"rentals": [self._rental(r) for r in self.system.snapshot().get_active_rentals()]}
+
+    def report_metrics(self, request) -> Dict:
+        self._user(request, admin=True)
+        return {"routes": self.metrics.report()}
+
+
+def _encode_response(status: int, payload: Dict) -> bytes:
+    return json.dumps(payload, default=Database._json_default).encode('utf-8')
+
+
+class ApiRequestHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keeps connections open between requests; idle ones close after `timeout` seconds
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    timeout = 30
+    api: RentalApi = None
+
+    def _dispatch(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        status, payload = self.api.handle(self.command, self.path, self.headers, body)
+        data = _encode_response(status, payload)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_DELETE = _dispatch
+
+    def log_message(self, format, *args):
+        # Per-request logging would dominate latency; /metrics reports on requests instead
+        pass
+
+
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer whose connections are served by a fixed pool of worker threads.
+
+    A keep-alive connection holds its worker until it closes or idles out, so
+    `workers` bounds the number of terminals served at once. Further connections
+    wait in the pool's queue.
+    """
+    daemon_threads = True
+
+    def __init__(self, address, api: RentalApi, workers: int = 16):
+        handler = type("BoundApiRequestHandler", (ApiRequestHandler,), {"api": api})
+        super().__init__(address, handler)
+        api.address = self.server_address
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="api-worker")
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._serve, request, client_address)
+
+    def _serve(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def _serve_connection(api: RentalApi, pool: ThreadPoolExecutor, reader, writer):
+    # Minimal HTTP/1.1 framing: request line, headers, Content-Length body, keep-alive by default
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            request_line = await asyncio.wait_for(reader.readline(), ApiRequestHandler.timeout)
+            if not request_line:
+                break
+            method, target, version = request_line.decode('latin-1').split()
+            headers = {}
+            while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                name, _, value = line.decode('latin-1').partition(":")
+                headers[name.strip().title()] = value.strip()
+            length = int(headers.get("Content-Length") or 0)
+            body = await reader.readexactly(length) if length else b""
+            status, payload = await loop.run_in_executor(pool, api.handle, method, target, headers, body)
+            data = _encode_response(status, payload)
+            keep_alive = headers.get("Connection", "").lower() != "close" and version == "HTTP/1.1"
+            writer.write(f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+                         f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                         f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + data)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve_asyncio(api: RentalApi, host: str, port: int, workers: int = 16,
+                        ready: Optional[threading.Event] = None):
+    """Serve every connection on one event loop; blocking system calls run on `workers` threads."""
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="api-worker")
+    server = await asyncio.start_server(lambda r, w: _serve_connection(api, pool, r, w), host, port)
+    api.address = server.sockets[0].getsockname()[:2]
+    if ready:
+        ready.set()
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def make_system(data_dir: str, storage: str, commit_window_ms: Optional[float] = None) -> ThreadSafeCarRentalSystem:
+    if storage == 'sqlite':
+        from sqlite_database import SQLiteDatabase
+        db_class = SQLiteDatabase
+    else:
+        db_class = JournalDatabase if storage == 'journal' else Database
+    return ThreadSafeCarRentalSystem(data_dir, db_class=db_class, commit_window_ms=commit_window_ms)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP/JSON API over a shared CarRentalSystem")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--storage", choices=["journal", "sqlite", "json"], default="journal")
+    parser.add_argument("--mode", choices=["threads", "asyncio"], default="threads")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--commit-window-ms", type=float, default=None,
+                        help="make every change durable before replying, grouping writes within this window")
+    parser.add_argument("--session-ttl", type=float, default=3600.0, help="seconds a login token stays valid")
+    args = parser.parse_args(argv)
+
+    system = make_system(args.data_dir, args.storage, args.commit_window_ms)
+    api = RentalApi(system, args.session_ttl)
+    print(f"Serving on http://{args.host}:{args.port} ({args.mode}, {args.workers} workers)")
+    try:
+        if args.mode == "asyncio":
+            asyncio.run(serve_asyncio(api, args.host, args.port, args.workers))
+        else:
+            with PooledHTTPServer((args.host, args.port), api, args.workers) as server:
+                server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        system.shutdown()
+
+
+if __name__ == "__main__":
+    main()
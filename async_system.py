@@ -0,0 +1,172 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from Backend import AbstractUser, CarRentalSystem, Customer, Database, Rental, StateSnapshot, Vehicle
+
+
+class _BatchedCarRentalSystem(CarRentalSystem):
+    """CarRentalSystem whose storage records are queued for AsyncCarRentalSystem to write."""
+
+    def __init__(self, data_dir: str, db_class: type):
+        self.pending: List[Dict] = []
+        super().__init__(data_dir, db_class)
+        # Journal compaction takes a snapshot from the storage thread
+        self.state_lock = threading.RLock()
+
+    def _store(self, entry: Dict):
+        self.pending.append(entry)
+
+    def save(self):
+        # Every mutation is followed by a commit, so there is nothing left for save() to do
+        pass
+
+
+class AsyncCarRentalSystem:
+    """Awaitable CarRentalSystem for a single asyncio event loop.
+
+    State changes run directly on the loop; they are in-memory and take
+    microseconds. Each mutating call then waits until its change is stored.
+    Storage runs on one background thread. Commits that arrive while a write is
+    in progress are batched into the next write, so one write (one journal
+    fsync, or one snapshot) covers every caller that arrived in the meantime.
+    Storage only ever holds the state lock to take a snapshot(), never during
+    I/O, so the loop waits on it for at most a snapshot rebuild. When a write
+    fails its callers get the error, and its records are put back to be retried
+    ahead of newer ones by the next write, or by shutdown().
+    """
+
+    def __init__(self, data_dir: str = 'data', db_class: type = Database):
+        self.system = _BatchedCarRentalSystem(data_dir, db_class)
+        # The first snapshot copies every user and vehicle; take it here rather than on the loop
+        self.system.snapshot()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="storage")
+        self._waiting: Optional[asyncio.Future] = None
+        self._writer: Optional[asyncio.Task] = None
+        self.commits = 0
+        self.writes = 0
+
+    @classmethod
+    async def open(cls, data_dir: str = 'data', db_class: type = Database) -> 'AsyncCarRentalSystem':
+        """Load the data files on a worker thread instead of blocking the event loop."""
+        return await asyncio.get_running_loop().run_in_executor(None, cls, data_dir, db_class)
+
+    async def _commit(self):
+        self.commits += 1
+        if self._waiting is None:
+            self._waiting = asyncio.get_running_loop().create_future()
+            if self._writer is None or self._writer.done():
+                self._writer = asyncio.ensure_future(self._write_batches())
+        # Shielded so a cancelled caller does not cancel the write for everyone else in its batch
+        await asyncio.shield(self._waiting)
+
+    async def _write_batches(self):
+        loop = asyncio.get_running_loop()
+        while self._waiting is not None:
+            waiting, self._waiting = self._waiting, None
+            entries, self.system.pending = self.system.pending, []
+            # Taken on the loop, so it cannot change while the storage thread encodes it
+            snapshot = self.system.snapshot()
+            try:
+                await loop.run_in_executor(self.executor, self._write, entries, snapshot)
+            except Exception as e:
+                # The changes are already applied in memory, so their records must still reach storage
+                self.system.pending[:0] = entries
+                waiting.set_exception(e)
+            else:
+                waiting.set_result(None)
+
+    def _write(self, entries: List[Dict], snapshot: StateSnapshot):
+        self.system.db.record_many(entries)
+        self.system.db.save_snapshot(snapshot)
+        self.writes += 1
+
+    async def _mutate(self, method, *args):
+        with self.system.state_lock:
+            result = method(*args)
+        await self._commit()
+        return result
+
+    async def _read_storage(self, method, *args):
+        # Storage reads share the storage thread, so they never overlap a write
+        return await asyncio.get_running_loop().run_in_executor(self.executor, method, *args)
+
+    async def get_user(self, username: str) -> Optional[AbstractUser]:
+        return self.system.get_user(username)
+
+    async def get_vehicle(self, License_Plate: str) -> Optional[Vehicle]:
+        return self.system.get_vehicle(License_Plate)
+
+    async def get_rental(self, rental_id: str) -> Optional[Rental]:
+        return self.system.get_rental(rental_id)
+
+    async def add_user(self, user: AbstractUser) -> AbstractUser:
+        return await self._mutate(self.system.add_user, user)
+
+    async def register_user(self, user_data: dict) -> Customer:
+        return await self._mutate(self.system.register_user, user_data)
+
+    async def authenticate(self, username: str, password: str) -> AbstractUser:
+        return self.system.authenticate(username, password)
+
+    async def get_active_rentals(self) -> List[Rental]:
+        return self.system.get_active_rentals()
+
+    async def get_rentals_due_today(self, now: Optional[datetime] = None) -> List[Rental]:
+        return self.system.get_rentals_due_today(now)
+
+    async def get_overdue_rentals(self, now: Optional[datetime] = None) -> List[Rental]:
+        return self.system.get_overdue_rentals(now)
+
+    async def rent_vehicle(self, username: str, License_Plate: str, start_date: datetime, end_date: datetime) -> Rental:
+        return await self._mutate(self.system.rent_vehicle, username, License_Plate, start_date, end_date)
+
+    async def return_vehicle(self, username: str) -> None:
+        await self._mutate(self.system.return_vehicle, username)
+
+    async def add_vehicle(self, vehicle_data: Dict) -> Vehicle:
+        return await self._mutate(self.system.add_vehicle, vehicle_data)
+
+    async def remove_vehicle(self, License_Plate: str) -> None:
+        await self._mutate(self.system.remove_vehicle, License_Plate)
+
+    async def get_available_vehicles(self) -> List[Vehicle]:
+        return self.system.get_available_vehicles()
+
+    async def find_available(self, start: datetime, end: datetime,
+                             filters: Optional[Dict[str, Any]] = None) -> List[Vehicle]:
+        return self.system.find_available(start, end, filters)
+
+    async def search_vehicles(self, *args, **kwargs) -> List[Vehicle]:
+        return self.system.search_vehicles(*args, **kwargs)
+
+    async def get_vehicle_options(self, field_name: str) -> List:
+        return self.system.get_vehicle_options(field_name)
+
+    async def get_vehicle_bookings(self, License_Plate: str) -> List[Rental]:
+        return self.system.get_vehicle_bookings(License_Plate)
+
+    async def get_user_rental_history(self, username: str) -> List[Rental]:
+        return await self._read_storage(self.system.get_user_rental_history, username)
+
+    async def get_user_rental_history_page(self, username: str, offset: int = 0, limit: int = 20) -> List[Rental]:
+        return await self._read_storage(self.system.get_user_rental_history_page, username, offset, limit)
+
+    async def add_funds(self, username: str, amount: float) -> float:
+        return await self._mutate(self.system.add_funds, username, amount)
+
+    async def save(self):
+        await self._commit()
+
+    async def shutdown(self):
+        if self._writer is not None:
+            await asyncio.gather(self._writer, return_exceptions=True)
+        try:
+            if self.system.pending:
+                # Records of a failed write that no later write has retried yet
+                await self._commit()
+        finally:
+            await self._read_storage(self.system.shutdown)
+            self.executor.shutdown()
@@ -0,0 +1,75 @@
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+MAKES = [("Toyota", "Corolla"), ("Honda", "Civic"), ("Suzuki", "Alto"),
+         ("Honda", "City"), ("Toyota", "Fortuner"), ("Haval", "H6")]
+
+
+def user_record(i: int) -> dict:
+    return {
+        "type": "Customer",
+        "username": f"user{i}",
+        "password": "secret",
+        "first_name": "First",
+        "last_name": f"Last{i}",
+        "email": f"user{i}@example.com",
+        "phone": "0300-0000000",
+        "address": "Lahore",
+        "balance": 1_000_000.0,
+        "current_rental": None,
+        "rental_history": []
+    }
+
+
+def vehicle_record(i: int) -> dict:
+    make, model = MAKES[i % len(MAKES)]
+    return {
+        "type": "Vehicle",
+        "License_Plate": f"PLT-{i:07d}",
+        "make": make,
+        "model": model,
+        "year": 2000 + i % 26,
+        "daily_rate": float(1000 + (i % 50) * 100),
+        "seating": 2 + i % 7,
+        "transmission": "Automatic" if i % 2 else "Manual",
+        "fuel_type": "Petrol" if i % 3 else "CNG",
+        "is_available": True
+    }
+
+
+def rental_record(i: int, users: int, vehicles: int) -> dict:
+    start = datetime(2024, 1, 1) + timedelta(days=i % 365)
+    return {
+        "id": f"rental-{i:09d}",
+        "user": f"user{i % users}",
+        "vehicle": f"PLT-{i % vehicles:07d}",
+        "start_date": start.isoformat(),
+        "end_date": (start + timedelta(days=1 + i % 7)).isoformat()
+    }
+
+
+def write_dataset(data_dir: Path, users: int, vehicles: int, rentals: int = 0):
+    """Write a synthetic JSON dataset in the Database file layout."""
+    data_dir.mkdir(parents=True, exist_ok=True)
+    files = {
+        "users.json": [user_record(i) for i in range(users)],
+        "vehicles.json": [vehicle_record(i) for i in range(vehicles)],
+        "rentals.json": [rental_record(i, users, vehicles) for i in range(rentals)],
+    }
+    for name, records in files.items():
+        with open(data_dir / name, 'w') as f:
+            json.dump(records, f)
+
+
+def timed(fn, repeat: int = 1) -> float:
+    """Return the mean wall time of ``fn`` in seconds."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
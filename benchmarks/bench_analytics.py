@@ -0,0 +1,46 @@
+"""Revenue-per-make report: Python loop over Rental.total_cost vs NumPy columns.
+
+Needs numpy. Run with ``python benchmarks/bench_analytics.py``.
+"""
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+
+from _common import timed, write_dataset
+
+from Backend import CarRentalSystem
+from analytics import RentalAnalytics
+
+SIZES = [10_000, 100_000, 500_000]
+
+
+def run(size: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        write_dataset(Path(tmp), users=size // 10, vehicles=size // 10, rentals=size)
+        system = CarRentalSystem(data_dir=tmp)
+
+    def loop():
+        revenue = defaultdict(float)
+        for rental in system.rentals:
+            revenue[rental.vehicle.make.title()] += float(rental.total_cost)
+        return revenue
+
+    analytics = None
+
+    def build():
+        nonlocal analytics
+        analytics = RentalAnalytics.from_system(system)
+
+    build_time = timed(build)
+    results = {
+        "python loop": timed(loop),
+        "columns build": build_time,
+        "vectorized": timed(analytics.revenue_per_make, repeat=10),
+    }
+    print(f"{size:>8} rentals  " + "  ".join(
+        f"{name}={seconds * 1e3:8.2f}ms" for name, seconds in results.items()))
+
+
+if __name__ == "__main__":
+    for size in SIZES:
+        run(size)
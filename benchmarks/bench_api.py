@@ -0,0 +1,92 @@
+"""Throughput and latency of the HTTP API in thread-pool and asyncio modes.
+
+Each client thread logs in as its own customer and keeps one connection open.
+It then books, returns and browses available vehicles in a loop. Latency
+percentiles come from the server's own metrics. Run with
+``python benchmarks/bench_api.py``.
+"""
+import asyncio
+import http.client
+import json
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from _common import write_dataset
+
+from Backend import JournalDatabase
+from api_server import PooledHTTPServer, RentalApi, serve_asyncio
+from concurrent_system import ThreadSafeCarRentalSystem
+
+CLIENTS = 16
+REQUESTS_PER_CLIENT = 500
+VEHICLES = 200
+WORKERS = 16
+
+
+def client(address, index, counts):
+    connection = http.client.HTTPConnection(*address)
+
+    def call(method, path, body=None, token=None):
+        headers = {"Content-Type": "application/json"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        connection.request(method, path, json.dumps(body).encode() if body is not None else None, headers)
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+
+    token = call("POST", "/login", {"username": f"user{index}", "password": "secret"})[1]["token"]
+    start = datetime(2030, 1, 1) + timedelta(days=index * 10)
+    for i in range(REQUESTS_PER_CLIENT // 3):
+        call("POST", "/rentals", {"License_Plate": f"PLT-{(index + i) % VEHICLES:07d}",
+                                  "start_date": start.isoformat(),
+                                  "end_date": (start + timedelta(days=1)).isoformat()}, token)
+        call("POST", "/rentals/return", {}, token)
+        call("GET", "/vehicles/available", token=token)
+    counts.append(REQUESTS_PER_CLIENT // 3 * 3 + 1)
+    connection.close()
+
+
+def start_server(mode, api):
+    if mode == "threads":
+        server = PooledHTTPServer(("127.0.0.1", 0), api, WORKERS)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server.shutdown
+    ready = threading.Event()
+    loop = asyncio.new_event_loop()
+    task = loop.create_task(serve_asyncio(api, "127.0.0.1", 0, WORKERS, ready))
+    threading.Thread(target=loop.run_until_complete, args=(asyncio.wait([task]),), daemon=True).start()
+    ready.wait()
+    return lambda: loop.call_soon_threadsafe(task.cancel)
+
+
+def run(mode):
+    with tempfile.TemporaryDirectory() as tmp:
+        write_dataset(Path(tmp), users=CLIENTS, vehicles=VEHICLES)
+        system = ThreadSafeCarRentalSystem(tmp, db_class=JournalDatabase)
+        api = RentalApi(system)
+        stop = start_server(mode, api)
+
+        counts = []
+        threads = [threading.Thread(target=client, args=(api.address, i, counts)) for i in range(CLIENTS)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        stop()
+        system.shutdown()
+
+    print(f"{mode:>8}: {sum(counts)} requests from {CLIENTS} clients in {elapsed:.2f}s "
+          f"({sum(counts) / elapsed:,.0f} req/s)")
+    for route, stats in api.metrics.report().items():
+        print(f"  {route:<24} n={stats['count']:>5}  p50={stats['p50_ms']:6.3f}ms  "
+              f"p99={stats['p99_ms']:6.3f}ms  errors={stats['errors']}")
+
+
+if __name__ == "__main__":
+    for mode in ("threads", "asyncio"):
+        run(mode)
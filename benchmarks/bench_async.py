@@ -0,0 +1,43 @@
+"""Concurrent booking sessions on one event loop with AsyncCarRentalSystem.
+
+Each session rents a car, tops up and returns it, waiting for every change to
+be stored. The script reports throughput and how many storage writes the
+batched commits needed. Run with ``python benchmarks/bench_async.py``.
+"""
+import asyncio
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from _common import write_dataset
+
+from Backend import JournalDatabase
+from async_system import AsyncCarRentalSystem
+
+SESSIONS = (10, 100, 1_000, 5_000)
+VEHICLES = 1_000
+
+
+async def session(system, i):
+    start = datetime(2030, 1, 1) + timedelta(days=(i // VEHICLES) * 2)
+    await system.rent_vehicle(f"user{i}", f"PLT-{i % VEHICLES:07d}", start, start + timedelta(days=1))
+    await system.add_funds(f"user{i}", 100.0)
+    await system.return_vehicle(f"user{i}")
+
+
+async def run(sessions):
+    with tempfile.TemporaryDirectory() as tmp:
+        write_dataset(Path(tmp), users=sessions, vehicles=VEHICLES)
+        system = await AsyncCarRentalSystem.open(tmp, JournalDatabase)
+        started = time.perf_counter()
+        await asyncio.gather(*(session(system, i) for i in range(sessions)))
+        elapsed = time.perf_counter() - started
+        await system.shutdown()
+    print(f"{sessions:>6} sessions: {system.commits:>6} commits in {system.writes:>4} writes, "
+          f"{elapsed:.3f}s ({system.commits / elapsed:,.0f} commits/s)")
+
+
+if __name__ == "__main__":
+    for count in SESSIONS:
+        asyncio.run(run(count))
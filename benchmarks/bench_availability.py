@@ -0,0 +1,66 @@
+"""Date-range availability against dense booking calendars.
+
+Every vehicle is booked back to back for BOOKINGS two-day slots. The calendar
+index is compared with a scan over every rental, which is what answering
+"which cars are free from X to Y" took before. Run with
+``python benchmarks/bench_availability.py``.
+"""
+import random
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from _common import timed, write_dataset
+
+from Backend import CarRentalSystem, VehicleNotAvailableError
+
+VEHICLES = 200
+BOOKINGS = [10, 100, 1_000]
+QUERIES = 200
+FIRST_DAY = datetime(2026, 1, 1)
+
+
+def run(bookings: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        write_dataset(Path(tmp), users=VEHICLES * bookings + 1, vehicles=VEHICLES)
+        system = CarRentalSystem(data_dir=tmp)
+        for i in range(VEHICLES * bookings):
+            start = FIRST_DAY + timedelta(days=2 * (i // VEHICLES))
+            system.rent_vehicle(f"user{i}", f"PLT-{i % VEHICLES:07d}", start, start + timedelta(days=2))
+
+    windows = []
+    for _ in range(QUERIES):
+        start = FIRST_DAY + timedelta(days=random.randrange(2 * bookings + 10))
+        windows.append((start, start + timedelta(days=1)))
+    spare = f"user{VEHICLES * bookings}"
+
+    def indexed():
+        for start, end in windows:
+            system.find_available(start, end)
+
+    def scan():
+        for start, end in windows:
+            busy = {r.vehicle.License_Plate for r in system.rentals if r.start_date < end and start < r.end_date}
+            [v for v in system.vehicles if v.License_Plate not in busy]
+
+    def rent_conflict():
+        for start, end in windows:
+            try:
+                system.rent_vehicle(spare, "PLT-0000000", start, end)
+            except VehicleNotAvailableError:
+                pass
+            else:
+                system.return_vehicle(spare)
+
+    results = {
+        "find_available": timed(indexed) / QUERIES,
+        "rental scan": timed(scan) / QUERIES,
+        "rent check": timed(rent_conflict) / QUERIES,
+    }
+    print(f"{bookings:>6} bookings/vehicle  " + "  ".join(
+        f"{name}={seconds * 1e3:8.3f}ms" for name, seconds in results.items()))
+
+
+if __name__ == "__main__":
+    for count in BOOKINGS:
+        run(count)
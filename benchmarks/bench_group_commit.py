@@ -0,0 +1,68 @@
+"""Durable write throughput with one save per operation vs group commit.
+
+Writer threads each top up and book for their own customer. Every operation
+must be durable before it returns: either the writer calls save() after each
+operation, or ThreadSafeCarRentalSystem waits on a GroupCommit. Storage is the
+journal, so a durable write is one fsync. Run with
+``python benchmarks/bench_group_commit.py``.
+"""
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from _common import write_dataset
+
+from Backend import JournalDatabase
+from concurrent_system import ThreadSafeCarRentalSystem
+
+WRITERS = (1, 8, 64)
+DURATION = 2.0
+WINDOW_MS = 2.0
+MAX_BATCH = 256
+
+
+def writer(system, index, stop, counts, save_each):
+    username, plate = f"user{index}", f"PLT-{index:07d}"
+    start, operations, cost = datetime(2030, 1, 1), 0, 0.0
+    while not stop.is_set():
+        if operations % 3 == 0:
+            cost = float(system.rent_vehicle(username, plate, start, start + timedelta(days=1)).total_cost)
+        elif operations % 3 == 1:
+            system.return_vehicle(username)
+        else:
+            system.add_funds(username, cost)
+        if save_each:
+            system.save()
+        operations += 1
+    counts.append(operations)
+
+
+def run(writers, group_commit):
+    with tempfile.TemporaryDirectory() as tmp:
+        write_dataset(Path(tmp), users=writers, vehicles=writers)
+        options = dict(commit_window_ms=WINDOW_MS, commit_max_batch=MAX_BATCH) if group_commit else {}
+        system = ThreadSafeCarRentalSystem(tmp, db_class=JournalDatabase, **options)
+        counts, stop = [], threading.Event()
+        threads = [threading.Thread(target=writer, args=(system, i, stop, counts, not group_commit))
+                   for i in range(writers)]
+        for thread in threads:
+            thread.start()
+        time.sleep(DURATION)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        system.shutdown()
+
+    operations = sum(counts)
+    line = f"{writers:>3} writers  {'group commit' if group_commit else 'save each':>12}: {operations / DURATION:>8,.0f} ops/s"
+    if group_commit:
+        line += f"  ({system.group_commit.records / max(system.group_commit.writes, 1):.1f} records per write)"
+    print(line)
+
+
+if __name__ == "__main__":
+    for count in WRITERS:
+        run(count, group_commit=False)
+        run(count, group_commit=True)
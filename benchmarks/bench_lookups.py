@@ -0,0 +1,47 @@
+"""Lookup latency of CarRentalSystem as the number of users and vehicles grows.
+
+Run with ``python benchmarks/bench_lookups.py``.
+"""
+import random
+import tempfile
+from pathlib import Path
+
+from _common import timed, write_dataset
+
+from Backend import CarRentalSystem
+
+SIZES = [1_000, 10_000, 100_000]
+QUERIES = 10_000
+
+
+def run(size: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        write_dataset(Path(tmp), users=size, vehicles=size)
+        system = CarRentalSystem(data_dir=tmp)
+        names = [f"user{random.randrange(size)}" for _ in range(QUERIES)]
+        plates = [f"PLT-{random.randrange(size):07d}" for _ in range(QUERIES)]
+
+        def authenticate():
+            for name in names:
+                system.authenticate(name, "secret")
+
+        def vehicles():
+            for plate in plates:
+                system.get_vehicle(plate)
+
+        def history():
+            for name in names:
+                system.get_user_rental_history(name)
+
+        results = {
+            "authenticate": timed(authenticate) / QUERIES,
+            "get_vehicle": timed(vehicles) / QUERIES,
+            "rental_history": timed(history) / QUERIES,
+        }
+    print(f"{size:>8} records  " + "  ".join(
+        f"{name}={seconds * 1e6:7.2f}us" for name, seconds in results.items()))
+
+
+if __name__ == "__main__":
+    for size in SIZES:
+        run(size)
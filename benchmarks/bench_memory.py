@@ -0,0 +1,34 @@
+"""Memory held by a loaded CarRentalSystem, measured with tracemalloc.
+
+Record counts are rentals; users and vehicles are a tenth of that.
+Run with ``python benchmarks/bench_memory.py``.
+"""
+import gc
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from _common import write_dataset
+
+from Backend import CarRentalSystem
+
+SIZES = [100_000, 500_000]
+
+
+def run(size: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        write_dataset(Path(tmp), users=size // 10, vehicles=size // 10, rentals=size)
+        gc.collect()
+        tracemalloc.start()
+        system = CarRentalSystem(data_dir=tmp)
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    entities = len(system.users) + len(system.vehicles) + len(system.rentals)
+    print(f"{size:>8} rentals  retained={current / 1e6:7.1f}MB  peak={peak / 1e6:7.1f}MB  "
+          f"per entity={current / entities:6.1f}B")
+
+
+if __name__ == "__main__":
+    for size in SIZES:
+        run(size)
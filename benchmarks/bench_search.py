@@ -0,0 +1,48 @@
+"""Vehicle search through the index vs a scan of every vehicle, at 100k vehicles.
+
+Each query returns its first page (PAGE results) in sorted order, as the
+Available Cars filter bar does. Run with ``python benchmarks/bench_search.py``.
+"""
+import tempfile
+from pathlib import Path
+
+from _common import timed, write_dataset
+
+from Backend import CarRentalSystem
+
+VEHICLES = 100_000
+PAGE = 50
+QUERIES = {
+    "make": dict(filters={"make": "Honda"}),
+    "make+gearbox+fuel": dict(filters={"make": "Toyota", "transmission": "Manual", "fuel_type": "CNG"}),
+    "seats+rate range": dict(filters={"seating": 7}, min_rate=2000, max_rate=3000),
+    "newest first": dict(sort_by="year", descending=True),
+    "rare combination": dict(filters={"make": "Haval", "seating": 5, "transmission": "Automatic"},
+                             min_year=2020, max_rate=2500),
+}
+
+
+def scan(system, filters=None, min_rate=None, max_rate=None, min_year=None, max_year=None,
+         sort_by="daily_rate", descending=False):
+    filters = {name: str(value).casefold() for name, value in (filters or {}).items()}
+    found = [v for v in system.vehicles if v.is_available
+             and all(str(getattr(v, name)).casefold() == value for name, value in filters.items())
+             and (min_rate is None or v.daily_rate >= min_rate) and (max_rate is None or v.daily_rate <= max_rate)
+             and (min_year is None or v.year >= min_year) and (max_year is None or v.year <= max_year)]
+    found.sort(key=lambda v: (getattr(v, sort_by), v.License_Plate), reverse=descending)
+    return found[:PAGE]
+
+
+def run():
+    with tempfile.TemporaryDirectory() as tmp:
+        write_dataset(Path(tmp), users=1, vehicles=VEHICLES)
+        system = CarRentalSystem(data_dir=tmp)
+
+    for name, query in QUERIES.items():
+        indexed = timed(lambda: system.search_vehicles(limit=PAGE, **query), repeat=100)
+        scanned = timed(lambda: scan(system, **query), repeat=3)
+        print(f"{name:>18}  index={indexed * 1e3:7.3f}ms  scan={scanned * 1e3:8.2f}ms")
+
+
+if __name__ == "__main__":
+    run()
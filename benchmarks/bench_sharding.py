@@ -0,0 +1,60 @@
+"""Booking throughput of ShardedCarRentalSystem as the shard count grows.
+
+Client threads each rent and return cars for their own customer through one
+router, spread over the whole fleet. Every shard is a separate process, so
+throughput can only scale up to the number of CPU cores. Run with
+``python benchmarks/bench_sharding.py``.
+"""
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from _common import write_dataset
+
+from sharding import ShardedCarRentalSystem, split_data_dir
+
+SHARDS = (1, 2, 4, 8)
+CLIENTS = 32
+VEHICLES = 4_000
+DURATION = 3.0
+
+
+def client(router, index, stop, counts):
+    username, start, bookings = f"user{index}", datetime(2030, 1, 1), 0
+    while not stop.is_set():
+        plate = f"PLT-{(index + bookings * CLIENTS) % VEHICLES:07d}"
+        router.rent_vehicle(username, plate, start, start + timedelta(days=1))
+        router.return_vehicle(username)
+        bookings += 1
+    counts.append(bookings)
+
+
+def run(source, shards):
+    with tempfile.TemporaryDirectory() as tmp:
+        split_data_dir(source, tmp, shards)
+        router = ShardedCarRentalSystem(tmp, connections=CLIENTS // shards + 1)
+        counts, stop = [], threading.Event()
+        threads = [threading.Thread(target=client, args=(router, i, stop, counts)) for i in range(CLIENTS)]
+        for thread in threads:
+            thread.start()
+        time.sleep(DURATION)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        started = time.perf_counter()
+        available = len(router.get_available_vehicles())
+        fan_out = time.perf_counter() - started
+        router.shutdown()
+    print(f"{shards} shard(s): {sum(counts) / DURATION:>7,.0f} bookings/s  "
+          f"get_available_vehicles over {available} cars: {fan_out * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    print(f"{os.cpu_count()} CPU core(s)")
+    with tempfile.TemporaryDirectory() as source:
+        write_dataset(Path(source), users=CLIENTS, vehicles=VEHICLES)
+        for count in SHARDS:
+            run(source, count)
@@ -0,0 +1,80 @@
+"""Reports during bookings: pinned snapshots vs holding the state lock.
+
+Writer threads book, return and refund cars while one thread builds
+RentalAnalytics over and over. The report reads either a pinned snapshot, or
+the live lists under the state lock (the only other way to see a consistent
+state). The script prints how long reporting kept writers out of the state
+lock. Writers also share the GIL with the report, so throughput moves less
+than lock time does. Run with ``python benchmarks/bench_snapshot.py``.
+"""
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from _common import write_dataset
+
+from analytics import RentalAnalytics
+from concurrent_system import ThreadSafeCarRentalSystem
+
+WRITERS = 8
+VEHICLES = 20_000
+RENTALS = 200_000
+DURATION = 3.0
+
+
+def writer(system, index, stop, counts):
+    username, plate = f"user{index}", f"PLT-{index:07d}"
+    start, bookings = datetime(2030, 1, 1), 0
+    while not stop.is_set():
+        rental = system.rent_vehicle(username, plate, start, start + timedelta(days=1))
+        system.return_vehicle(username)
+        system.add_funds(username, float(rental.total_cost))
+        bookings += 1
+    counts.append(bookings)
+
+
+def reporter(system, stop, holds, use_snapshot):
+    # Records how long each report kept writers out of the state lock
+    while not stop.is_set():
+        if use_snapshot:
+            started = time.perf_counter()
+            snapshot = system.snapshot()
+            holds.append(time.perf_counter() - started)
+            RentalAnalytics(snapshot.rentals, snapshot.vehicles).revenue_per_make()
+        else:
+            with system.state_lock:
+                started = time.perf_counter()
+                RentalAnalytics(system.rentals, system.vehicles).revenue_per_make()
+                holds.append(time.perf_counter() - started)
+
+
+def run(system, use_snapshot):
+    counts, holds, stop = [], [], threading.Event()
+    threads = [threading.Thread(target=writer, args=(system, i, stop, counts)) for i in range(WRITERS)]
+    threads.append(threading.Thread(target=reporter, args=(system, stop, holds, use_snapshot)))
+    for thread in threads:
+        thread.start()
+    time.sleep(DURATION)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    print(f"{'snapshot' if use_snapshot else 'state lock':>10}: {sum(counts) / DURATION:>7,.0f} bookings/s, "
+          f"{len(holds)} reports held the state lock for {sum(holds) * 1000:8.2f}ms in total, "
+          f"{max(holds) * 1000:7.2f}ms at most")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        write_dataset(Path(tmp), users=WRITERS, vehicles=VEHICLES, rentals=RENTALS)
+        system = ThreadSafeCarRentalSystem(tmp)
+        snapshot = system.snapshot()
+        rebuild = time.perf_counter()
+        system.version += 1
+        system.snapshot()
+        print(f"snapshot rebuild after a change: {(time.perf_counter() - rebuild) * 1000:.2f}ms "
+              f"({len(snapshot.vehicles)} vehicles, {len(snapshot.rentals)} rentals)")
+        run(system, use_snapshot=False)
+        run(system, use_snapshot=True)
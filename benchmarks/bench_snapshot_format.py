@@ -0,0 +1,41 @@
+"""JSON versus binary snapshot format: load time, save time and file size.
+
+Record counts are rentals; users and vehicles are a tenth of that.
+Run with ``python benchmarks/bench_snapshot_format.py``.
+"""
+import tempfile
+from pathlib import Path
+
+from _common import timed, write_dataset
+
+from Backend import CarRentalSystem
+from binary_snapshot import BinaryDatabase
+
+SIZES = [10_000, 100_000, 1_000_000]
+
+
+def total_size(data_dir: Path, suffix: str) -> int:
+    return sum(path.stat().st_size for path in data_dir.glob(f"*{suffix}"))
+
+
+def run(size: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp)
+        write_dataset(data_dir, users=size // 10, vehicles=size // 10, rentals=size)
+        system = CarRentalSystem(data_dir=tmp)
+        json_save = timed(system.shutdown)
+        json_load = timed(lambda: CarRentalSystem(data_dir=tmp))
+
+        binary = BinaryDatabase(system, tmp)
+        binary_save = timed(lambda: binary.save_all(system.users, system.vehicles, system.rentals))
+        binary_load = timed(lambda: CarRentalSystem(data_dir=tmp, db_class=BinaryDatabase))
+
+        json_bytes, binary_bytes = total_size(data_dir, ".json"), total_size(data_dir, ".bin")
+    print(f"{size:>9} records  load json={json_load:6.2f}s binary={binary_load:6.2f}s  "
+          f"save json={json_save:6.2f}s binary={binary_save:6.2f}s  "
+          f"size json={json_bytes / 1e6:7.1f}MB binary={binary_bytes / 1e6:7.1f}MB")
+
+
+if __name__ == "__main__":
+    for size in SIZES:
+        run(size)
@@ -0,0 +1,33 @@
+"""Write throughput of plain versus atomic (fsync + manifest rename) snapshots.
+
+Run with ``python benchmarks/bench_snapshot_writes.py``.
+"""
+import tempfile
+from pathlib import Path
+
+from _common import timed, write_dataset
+
+from Backend import AtomicDatabase, CarRentalSystem, Database
+
+SIZES = [1_000, 10_000, 100_000]
+
+
+def run(size: int):
+    results = {}
+    for db_class in (Database, AtomicDatabase):
+        with tempfile.TemporaryDirectory() as tmp:
+            write_dataset(Path(tmp), users=size, vehicles=size, rentals=size)
+            system = CarRentalSystem(data_dir=tmp, db_class=db_class)
+            repeat = max(1, 20_000 // size)
+            seconds = timed(system.shutdown, repeat=repeat)
+            written = sum(path.stat().st_size for path in (system.db.users_file, system.db.vehicles_file,
+                                                           system.db.rentals_file))
+            results[db_class.__name__] = (seconds, written)
+    print(f"{size:>7} records  " + "  ".join(
+        f"{name}={seconds * 1e3:8.1f}ms/save ({written / seconds / 1e6:6.1f} MB/s)"
+        for name, (seconds, written) in results.items()))
+
+
+if __name__ == "__main__":
+    for size in SIZES:
+        run(size)
@@ -0,0 +1,47 @@
+"""JSON Database versus SQLiteDatabase: startup, one durable top-up and the available vehicles query.
+
+Run with ``python benchmarks/bench_sqlite.py``.
+"""
+import tempfile
+from pathlib import Path
+
+from _common import timed, write_dataset
+
+from Backend import CarRentalSystem
+from sqlite_database import SQLiteDatabase, migrate_json_to_sqlite
+
+SIZES = [1_000, 10_000, 100_000]
+
+
+def run(size: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        write_dataset(Path(tmp), users=size, vehicles=size, rentals=size)
+        migrate_json_to_sqlite(tmp).close()
+
+        json_load = timed(lambda: CarRentalSystem(data_dir=tmp))
+        sqlite_load = timed(lambda: CarRentalSystem(data_dir=tmp, db_class=SQLiteDatabase))
+
+        json_system = CarRentalSystem(data_dir=tmp)
+        sqlite_system = CarRentalSystem(data_dir=tmp, db_class=SQLiteDatabase)
+
+        def json_top_up():
+            json_system.add_funds("user0", 100)
+            json_system.shutdown()
+
+        def sqlite_top_up():
+            sqlite_system.add_funds("user0", 100)
+            sqlite_system.shutdown()
+
+        json_write = timed(json_top_up, repeat=5)
+        sqlite_write = timed(sqlite_top_up, repeat=50)
+        json_query = timed(lambda: CarRentalSystem(data_dir=tmp).get_available_vehicles())
+        sqlite_query = timed(lambda: SQLiteDatabase(None, tmp).query_available_vehicles(), repeat=5)
+
+    print(f"{size:>7} records  load json={json_load * 1e3:8.1f}ms sqlite={sqlite_load * 1e3:8.1f}ms  "
+          f"top-up json={json_write * 1e3:8.2f}ms sqlite={sqlite_write * 1e3:6.2f}ms  "
+          f"cold available-query json={json_query * 1e3:8.1f}ms sqlite={sqlite_query * 1e3:7.1f}ms")
+
+
+if __name__ == "__main__":
+    for size in SIZES:
+        run(size)
@@ -0,0 +1,28 @@
+"""Cold start time of CarRentalSystem over a large synthetic dataset.
+
+Load time should grow linearly with the number of rentals.
+Run with ``python benchmarks/bench_startup.py``.
+"""
+import tempfile
+from pathlib import Path
+
+from _common import timed, write_dataset
+
+from Backend import CarRentalSystem
+
+USERS = 20_000
+VEHICLES = 20_000
+RENTALS = [10_000, 100_000, 300_000]
+
+
+def run(rentals: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        write_dataset(Path(tmp), users=USERS, vehicles=VEHICLES, rentals=rentals)
+        seconds = timed(lambda: CarRentalSystem(data_dir=tmp))
+    print(f"{rentals:>8} rentals  load={seconds:6.2f}s  per rental={seconds / rentals * 1e6:6.2f}us")
+
+
+if __name__ == "__main__":
+    print(f"{USERS} users, {VEHICLES} vehicles")
+    for rentals in RENTALS:
+        run(rentals)
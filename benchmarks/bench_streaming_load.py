@@ -0,0 +1,57 @@
+"""Peak memory of loading with json.load versus the streaming record decoder.
+
+Each mode runs in a fresh subprocess and reports its peak RSS (VmHWM), next to
+the RSS of the interpreter before loading. Linux only (reads /proc/self/status).
+Run with ``python benchmarks/bench_streaming_load.py``.
+"""
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from _common import write_dataset
+
+RENTALS = [100_000, 500_000]
+
+CHILD = """
+import json, sys
+sys.path.insert(0, {root!r})
+from Backend import CarRentalSystem, Database
+
+if sys.argv[1] == "json.load":
+    def load_entities(path, decoder):
+        if not path.exists():
+            return []
+        with open(path) as f:
+            return [decoder(data) for data in json.load(f)]
+    Database._load_entities = staticmethod(load_entities)
+
+def high_water_kb():
+    with open("/proc/self/status") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith("VmHWM:"))
+
+before = high_water_kb()
+system = CarRentalSystem(data_dir=sys.argv[2])
+print(before, high_water_kb())
+"""
+
+
+def peak_rss_mb(mode: str, data_dir: str):
+    root = str(Path(__file__).resolve().parent.parent)
+    output = subprocess.run([sys.executable, "-c", CHILD.format(root=root), mode, data_dir],
+                            capture_output=True, text=True, check=True).stdout
+    before, after = (int(value) / 1024 for value in output.split())
+    return before, after
+
+
+def run(rentals: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        write_dataset(Path(tmp), users=rentals // 10, vehicles=rentals // 10, rentals=rentals)
+        results = {mode: peak_rss_mb(mode, tmp) for mode in ("json.load", "streaming")}
+    print(f"{rentals:>8} rentals  " + "  ".join(
+        f"{mode}: peak={after:7.1f}MB (+{after - before:6.1f}MB)" for mode, (before, after) in results.items()))
+
+
+if __name__ == "__main__":
+    for rentals in RENTALS:
+        run(rentals)
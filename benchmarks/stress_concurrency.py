@@ -0,0 +1,146 @@
+"""Multi-threaded stress test of ThreadSafeCarRentalSystem.
+
+Worker threads rent, return and top up against a small fleet and few customers,
+so most operations contend. A reader thread runs reports at the same time.
+Thread switches are forced very often. The script then checks the invariants:
+- no vehicle is double-booked and no balance goes negative;
+- money is conserved;
+- the journal replays to the same state;
+- no snapshot shows a rented vehicle as available.
+Run with ``python benchmarks/stress_concurrency.py``. Pass ``--unsafe`` to run
+the plain CarRentalSystem for comparison, or ``--group-commit`` to make every
+operation durable through group commit.
+"""
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+from _common import write_dataset
+
+from Backend import (ActiveRentalExistsError, CarRentalSystem, Customer, InsufficientBalanceError,
+                     JournalDatabase, NoActiveRentalError, VehicleNotAvailableError)
+from concurrent_system import ThreadSafeCarRentalSystem
+
+THREADS = 16
+OPS_PER_THREAD = 3_000
+CUSTOMERS = 40
+VEHICLES = 8
+STARTING_BALANCE = 5_000.0
+TOP_UP = 1_000.0
+FIRST_DAY = datetime(2026, 1, 1)
+EXPECTED = (ActiveRentalExistsError, InsufficientBalanceError, NoActiveRentalError, VehicleNotAvailableError)
+
+
+def worker(system, seed, totals, failures):
+    rng = random.Random(seed)
+    spent, topped_up = Decimal(0), 0.0
+    for _ in range(OPS_PER_THREAD):
+        username = f"user{rng.randrange(CUSTOMERS)}"
+        choice = rng.random()
+        try:
+            if choice < 0.5:
+                start = FIRST_DAY + timedelta(days=rng.randrange(30))
+                rental = system.rent_vehicle(username, f"PLT-{rng.randrange(VEHICLES):07d}", start,
+                                             start + timedelta(days=rng.randint(1, 5)))
+                spent += rental.total_cost
+            elif choice < 0.8:
+                system.return_vehicle(username)
+            else:
+                system.add_funds(username, TOP_UP)
+                topped_up += TOP_UP
+        except EXPECTED:
+            pass
+        except Exception as e:
+            failures.append(repr(e))
+    totals.append((spent, topped_up))
+
+
+def reader(system, stop, failures):
+    while not stop.is_set():
+        try:
+            system.get_active_rentals()
+            system.search_vehicles(limit=5)
+            system.get_overdue_rentals(FIRST_DAY + timedelta(days=10))
+            snapshot = system.snapshot()
+            if any(r.vehicle.License_Plate in snapshot.available for r in snapshot.get_active_rentals()):
+                failures.append("reader: snapshot shows a rented vehicle as available")
+        except Exception as e:
+            failures.append(f"reader: {e!r}")
+
+
+def check(system, totals, data_dir) -> list:
+    problems = []
+    customers = [u for u in system.users if isinstance(u, Customer)]
+    if any(c.balance < 0 for c in customers):
+        problems.append("negative balance")
+
+    spent = sum(t[0] for t in totals)
+    topped_up = sum(t[1] for t in totals)
+    money_in = CUSTOMERS * STARTING_BALANCE + topped_up
+    money_out = sum(c.balance for c in customers) + float(spent)
+    if abs(money_in - money_out) > 0.01:
+        problems.append(f"money not conserved: {money_in:.2f} in, {money_out:.2f} accounted for")
+
+    for vehicle in system.vehicles:
+        bookings = sorted((r for c in customers if (r := c.current_rental) and r.vehicle is vehicle),
+                          key=lambda r: r.start_date)
+        if any(a.end_date > b.start_date for a, b in zip(bookings, bookings[1:])):
+            problems.append(f"{vehicle.License_Plate} double-booked")
+        if [r.id for r in bookings] != [r.id for r in system.get_vehicle_bookings(vehicle.License_Plate)]:
+            problems.append(f"{vehicle.License_Plate} calendar out of sync")
+
+    system.shutdown()
+    reloaded = CarRentalSystem(data_dir, db_class=JournalDatabase)
+    for customer in customers:
+        other = reloaded.get_user(customer.username)
+        current = customer.current_rental.id if customer.current_rental else None
+        if abs(other.balance - customer.balance) > 0.01 or \
+                (other.current_rental.id if other.current_rental else None) != current:
+            problems.append(f"{customer.username} differs after replay")
+    return problems
+
+
+def run(system_class, **options):
+    sys.setswitchinterval(1e-6)
+    with tempfile.TemporaryDirectory() as tmp:
+        write_dataset(Path(tmp), users=CUSTOMERS, vehicles=VEHICLES)
+        system = system_class(tmp, db_class=JournalDatabase, **options)
+        system.db.compact_every = 500  # Compact repeatedly while writers are running
+        for customer in system.users:
+            customer._balance = STARTING_BALANCE
+
+        totals, failures, stop = [], [], threading.Event()
+        threads = [threading.Thread(target=worker, args=(system, seed, totals, failures)) for seed in range(THREADS)]
+        watcher = threading.Thread(target=reader, args=(system, stop, failures))
+        started = time.perf_counter()
+        watcher.start()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        stop.set()
+        watcher.join()
+
+        problems = failures[:5] + check(system, totals, tmp)
+    operations = THREADS * OPS_PER_THREAD
+    print(f"{system_class.__name__}: {operations} operations on {THREADS} threads in {elapsed:.2f}s "
+          f"({operations / elapsed:,.0f} ops/s), {len(system.rentals)} rentals")
+    for problem in problems:
+        print(f"  FAILED: {problem}")
+    return not problems
+
+
+if __name__ == "__main__":
+    if "--unsafe" in sys.argv:
+        passed = run(CarRentalSystem)
+    elif "--group-commit" in sys.argv:
+        passed = run(ThreadSafeCarRentalSystem, commit_window_ms=1.0)
+    else:
+        passed = run(ThreadSafeCarRentalSystem)
+    sys.exit(0 if passed else 1)
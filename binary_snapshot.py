@@ -0,0 +1,275 @@
+import os
+import struct
+import sys
+from array import array
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Dict, Optional
+
+from Backend import (AbstractUser, Admin, CarRentalSystem, Customer, Database, DatabaseError, Rental,
+                     Vehicle)
+
+MAGIC = b'FAMB'
+# 2: rentals carry the daily rate frozen at booking; 3: vehicles carry a retired flag;
+# 4: datetimes are epoch microseconds and the three tables share one file
+FORMAT_VERSION = 4
+HEADER = struct.Struct('<4sHBIH')  # magic, version, table kind, row count, column count
+COLUMN = struct.Struct('<Q')       # byte length of the column that follows
+
+USERS, VEHICLES, RENTALS = 1, 2, 3
+EPOCH = datetime(1970, 1, 1)
+
+
+class BinaryDatabase(Database):
+    """Compact columnar snapshot in snapshot.bin.
+
+    The file holds the users, vehicles and rentals tables back to back, each a
+    versioned header followed by one packed column per field. Strings are stored
+    NUL-joined as UTF-8, datetimes as epoch microseconds and money as integer paisa.
+    Saves write a temporary file and rename it into place, so a load sees either the
+    old snapshot or the new one. The per-table users.bin, vehicles.bin and
+    rentals.bin of older versions are still loaded. Without .bin files the JSON
+    snapshot is loaded instead, and export_json writes the JSON format back out.
+    """
+
+    def __init__(self, system: 'CarRentalSystem', data_dir: str = 'data'):
+        super().__init__(system, data_dir)
+        self.users_bin = self.data_dir / 'users.bin'
+        self.vehicles_bin = self.data_dir / 'vehicles.bin'
+        self.rentals_bin = self.data_dir / 'rentals.bin'
+        self.snapshot_bin = self.data_dir / 'snapshot.bin'
+        # Tables of the snapshot being loaded, read once for all three loads
+        self._tables: Optional[Dict[int, tuple]] = None
+
+    def load_users(self) -> List[AbstractUser]:
+        table = self._table(USERS, self.users_bin)
+        if table is None:
+            return super().load_users()
+        _, count, (types, usernames, passwords, first_names, last_names, emails, phones, addresses,
+                   balances, current_rentals, history_counts, history_ids) = table
+        types = _unpack_ints('B', types)
+        balances = _unpack_ints('q', balances)
+        history_counts = _unpack_ints('I', history_counts)
+        columns = [_unpack_strings(column, count) for column in
+                   (usernames, passwords, first_names, last_names, emails, phones, addresses, current_rentals)]
+        history_ids = _unpack_strings(history_ids, sum(history_counts))
+
+        users = []
+        self._rental_links: Dict[str, tuple] = {}
+        position = 0
+        for i in range(count):
+            username, password, first_name, last_name, email, phone, address, current = (c[i] for c in columns)
+            if types[i] == 1:
+                users.append(Admin(username=username, password=password, first_name=first_name,
+                                   last_name=last_name, email=email, phone=phone, address=address))
+                continue
+            users.append(Customer(username=username, password=password, first_name=first_name,
+                                  last_name=last_name, email=email, phone=phone, address=address,
+                                  _balance=balances[i] / 100))
+            self._rental_links[username] = (current or None, history_ids[position:position + history_counts[i]])
+            position += history_counts[i]
+        return users
+
+    def load_vehicles(self) -> List[Vehicle]:
+        table = self._table(VEHICLES, self.vehicles_bin)
+        if table is None:
+            return super().load_vehicles()
+        _, count, (plates, makes, models, years, rates, seating, transmissions, fuel_types,
+                   available, *retired) = table
+        plates, makes, models, transmissions, fuel_types = (
+            _unpack_strings(column, count) for column in (plates, makes, models, transmissions, fuel_types))
+        years, rates, seating, available = (
+            _unpack_ints(code, column) for code, column in (('H', years), ('q', rates), ('H', seating),
+                                                            ('B', available)))
+        # Files older than version 3 only hold current vehicles
+        retired = _unpack_ints('B', retired[0]) if retired else [0] * count
+        return [Vehicle(License_Plate=plates[i], make=makes[i], model=models[i], year=years[i],
+                        daily_rate=rates[i] / 100, seating=seating[i], transmission=transmissions[i],
+                        fuel_type=fuel_types[i], is_available=bool(available[i]), retired=bool(retired[i]))
+                for i in range(count)]
+
+    def load_rentals(self) -> List[Rental]:
+        table = self._table(RENTALS, self.rentals_bin)
+        # Rentals are loaded last, so the snapshot's bytes can be released
+        self._tables = None
+        if table is None:
+            return super().load_rentals()
+        users = {u.username: u for u in self.system.users if isinstance(u, Customer)}
+        vehicles = self._rental_vehicles()
+        version, count, (ids, usernames, plates, starts, ends, *rates) = table
+        ids, usernames, plates = (_unpack_strings(column, count) for column in (ids, usernames, plates))
+        starts, ends = _unpack_ints('q', starts), _unpack_ints('q', ends)
+        # Version 1 files have no rate column; those rentals take the vehicle's current rate
+        rates = _unpack_ints('q', rates[0]) if rates else [None] * count
+
+        # Rentals mostly start and end on the same few thousand midnights, so decode each timestamp once
+        unit = timedelta(microseconds=1) if version >= 4 else timedelta(seconds=1)
+        dates = {epoch: EPOCH + epoch * unit for epoch in set(starts) | set(ends)}
+        rentals = []
+        for i in range(count):
+            try:
+                user, vehicle = users[usernames[i]], vehicles[plates[i]]
+            except KeyError:
+                raise DatabaseError("Invalid rental reference")
+            # The frozen cost is rate times duration, so only the rate is stored
+            rentals.append(Rental(user=user, vehicle=vehicle, start_date=dates[starts[i]],
+                                  end_date=dates[ends[i]], id=ids[i],
+                                  daily_rate=None if rates[i] is None else rates[i] / 100))
+        self._relink_rentals(users, {r.id: r for r in rentals})
+        return rentals
+
+    def save_all(self, users: List[AbstractUser], vehicles: List[Vehicle], rentals: List[Rental]):
+        customers = [u if isinstance(u, Customer) else None for u in users]
+        tables = [(USERS, len(users), [
+            _pack_ints('B', [0 if c else 1 for c in customers]),
+            *(_pack_strings([getattr(u, name) for u in users])
+              for name in ('username', 'password', 'first_name', 'last_name', 'email', 'phone', 'address')),
+            _pack_ints('q', [_to_paisa(c.balance) if c else 0 for c in customers]),
+            _pack_strings([c.current_rental.id if c and c.current_rental else '' for c in customers]),
+            _pack_ints('I', [len(c.rental_history) if c else 0 for c in customers]),
+            _pack_strings([r.id for c in customers if c for r in c.rental_history]),
+        ]), (VEHICLES, len(vehicles), [
+            _pack_strings([v.License_Plate for v in vehicles]),
+            _pack_strings([v.make for v in vehicles]),
+            _pack_strings([v.model for v in vehicles]),
+            _pack_ints('H', [v.year for v in vehicles]),
+            _pack_ints('q', [_to_paisa(v.daily_rate) for v in vehicles]),
+            _pack_ints('H', [v.seating for v in vehicles]),
+            _pack_strings([v.transmission for v in vehicles]),
+            _pack_strings([v.fuel_type for v in vehicles]),
+            _pack_ints('B', [v.is_available for v in vehicles]),
+            _pack_ints('B', [v.retired for v in vehicles]),
+        ]), (RENTALS, len(rentals), [
+            _pack_strings([r.id for r in rentals]),
+            _pack_strings([r.user.username for r in rentals]),
+            _pack_strings([r.vehicle.License_Plate for r in rentals]),
+            _pack_ints('q', [_to_micros(r.start_date) for r in rentals]),
+            _pack_ints('q', [_to_micros(r.end_date) for r in rentals]),
+            _pack_ints('q', [_to_paisa(r.daily_rate) for r in rentals]),
+        ])]
+
+        temp_file = self.snapshot_bin.with_suffix('.bin.tmp')
+        try:
+            with open(temp_file, 'wb') as f:
+                for kind, count, columns in tables:
+                    f.write(HEADER.pack(MAGIC, FORMAT_VERSION, kind, count, len(columns)))
+                    for column in columns:
+                        f.write(COLUMN.pack(len(column)))
+                        f.write(column)
+                # The rename must not reach the disk before the data it points at
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_file, self.snapshot_bin)
+        except OSError as e:
+            raise DatabaseError(f"Failed to save {self.snapshot_bin.name}: {str(e)}")
+        # snapshot.bin now takes precedence, so the per-table files of older versions are stale
+        for path in (self.users_bin, self.vehicles_bin, self.rentals_bin):
+            try:
+                path.unlink(missing_ok=True)
+            except OSError:
+                pass
+
+    def export_json(self):
+        # Write the loaded state back out as users.json, vehicles.json and rentals.json
+        Database.save_all(self, self.system.users, self.system._stored_vehicles(), self.system.rentals)
+
+    def _table(self, kind: int, legacy: Path) -> Optional[tuple]:
+        # (version, row count, columns) of one table, or None when there is no binary snapshot
+        if self.snapshot_bin.exists():
+            if self._tables is None:
+                self._tables = self._read_tables(self.snapshot_bin)
+            tables, path = self._tables, self.snapshot_bin
+        elif legacy.exists():
+            tables, path = self._read_tables(legacy), legacy
+        else:
+            return None
+        if kind not in tables:
+            raise DatabaseError(f"{path.name} is not a valid snapshot table")
+        return tables[kind]
+
+    @staticmethod
+    def _read_tables(path: Path) -> Dict[int, tuple]:
+        try:
+            data = path.read_bytes()
+        except OSError as e:
+            raise DatabaseError(f"Failed to read {path.name}: {str(e)}")
+
+        tables = {}
+        offset = 0
+        view = memoryview(data)
+        while offset < len(data):
+            if len(data) - offset < HEADER.size:
+                raise DatabaseError(f"{path.name} is truncated")
+            magic, version, kind, count, column_count = HEADER.unpack_from(data, offset)
+            if magic != MAGIC or kind not in (USERS, VEHICLES, RENTALS):
+                raise DatabaseError(f"{path.name} is not a valid snapshot table")
+            if version > FORMAT_VERSION:
+                raise DatabaseError(f"{path.name} uses snapshot format {version}, newer than {FORMAT_VERSION}")
+            offset += HEADER.size
+            columns = []
+            for _ in range(column_count):
+                if len(data) - offset < COLUMN.size:
+                    raise DatabaseError(f"{path.name} is truncated")
+                (length,) = COLUMN.unpack_from(data, offset)
+                offset += COLUMN.size
+                if len(data) - offset < length:
+                    raise DatabaseError(f"{path.name} is truncated")
+                columns.append(view[offset:offset + length])
+                offset += length
+            tables[kind] = (version, count, columns)
+        return tables
+
+
+def _to_paisa(amount: float) -> int:
+    return round(amount * 100)
+
+
+def _to_micros(value: datetime) -> int:
+    # Integer division of timedeltas is exact, unlike going through float seconds
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+def _pack_strings(values: List[str]) -> bytes:
+    joined = '\0'.join(values)
+    if joined.count('\0') != max(len(values) - 1, 0):
+        raise DatabaseError("Text fields cannot contain NUL characters")
+    return joined.encode('utf-8')
+
+
+def _unpack_strings(column, count: int) -> List[str]:
+    return str(column, 'utf-8').split('\0') if count else []
+
+
+def _pack_ints(typecode: str, values) -> bytes:
+    # Columns are always stored little-endian
+    column = array(typecode, values)
+    if sys.byteorder == 'big':
+        column.byteswap()
+    return column.tobytes()
+
+
+def _unpack_ints(typecode: str, column) -> array:
+    values = array(typecode)
+    values.frombytes(column)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def convert(data_dir: str = 'data', to: str = 'binary') -> BinaryDatabase:
+    """Convert a data directory between the JSON and binary snapshot formats."""
+    system = CarRentalSystem(data_dir, db_class=BinaryDatabase)
+    if to == 'binary':
+        system.shutdown()
+    elif to == 'json':
+        system.db.export_json()
+    else:
+        raise ValueError(f"Unknown snapshot format {to}")
+    return system.db
+
+
+if __name__ == "__main__":
+    target_format = sys.argv[1] if len(sys.argv) > 1 else 'binary'
+    target_dir = sys.argv[2] if len(sys.argv) > 2 else 'data'
+    convert(target_dir, target_format)
+    print(f"Converted {target_dir} to {target_format}")
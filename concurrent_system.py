@@ -0,0 +1,261 @@
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from datetime import datetime
+from typing import List, Dict, Optional
+
+from Backend import AbstractUser, CarRentalSystem, Database, Rental, Vehicle
+
+
+class _Batch:
+    def __init__(self):
+        self.entries: List[Dict] = []
+        self.done = threading.Event()
+        self.error: Optional[Exception] = None
+
+
+class GroupCommit:
+    """Makes records from many threads durable with one storage write per batch.
+
+    Callers add their records to the open batch and wait. While other mutations
+    are still in flight, a writer thread holds the batch open for up to window_ms
+    so they can join, or until it holds max_batch records. A lone caller is written
+    at once. Each batch is one Database.record_many and one save_all (a journal
+    fsync, or one snapshot), after which every caller in it is woken.
+    """
+
+    def __init__(self, system: 'ThreadSafeCarRentalSystem', window_ms: float = 2.0, max_batch: int = 256):
+        self.system = system
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.condition = threading.Condition()
+        self.batch = _Batch()
+        self.closing = False
+        self.in_flight = 0
+        self.writes = 0
+        self.records = 0
+        self.thread = threading.Thread(target=self.run, name="group-commit", daemon=True)
+        self.thread.start()
+
+    def begin(self):
+        with self.condition:
+            self.in_flight += 1
+
+    def submit(self, entries: List[Dict]) -> _Batch:
+        # Ends the mutation started by begin(), even when it has nothing to store
+        with self.condition:
+            self.in_flight -= 1
+            batch = self.batch
+            batch.entries.extend(entries)
+            if batch.entries:
+                self.condition.notify()
+            return batch
+
+    @staticmethod
+    def wait(batch: _Batch):
+        batch.done.wait()
+        if batch.error is not None:
+            raise batch.error
+
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.batch.entries and not self.closing:
+                    self.condition.wait()
+                if not self.batch.entries:
+                    return
+                deadline = time.monotonic() + self.window
+                while self.in_flight and len(self.batch.entries) < self.max_batch and not self.closing:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+                batch, self.batch = self.batch, _Batch()
+            try:
+                self.system._write_batch(batch.entries)
+                self.writes += 1
+                self.records += len(batch.entries)
+            except Exception as e:
+                batch.error = e
+            batch.done.set()
+
+    def shutdown(self):
+        with self.condition:
+            self.closing = True
+            self.condition.notify()
+        self.thread.join()
+
+
+class ThreadSafeCarRentalSystem(CarRentalSystem):
+    """CarRentalSystem that can be shared by worker threads.
+
+    Every mutation holds the lock of each customer and vehicle it touches, customers
+    first, and then the state lock for its whole check-and-act. The state lock is one
+    coarse lock over all in-memory state, so the checks (availability, active rental,
+    balance) and changes of all mutations run one at a time, and reads wait for them.
+    The storage write happens after the state lock is released, still under the
+    entity locks, so each customer's and vehicle's records reach the database in
+    order while writes for other customers and vehicles proceed. Full saves and
+    journal compaction write a snapshot(), so storage holds the state lock only while
+    the snapshot is copied, never during I/O. Locks are always taken in the order
+    entity, storage, state.
+
+    Entity locks exist only for current customers and vehicles and for those being
+    added; a mutation that leaves its entity missing drops the lock on the way out.
+
+    With commit_window_ms set, each mutation returns only once it is durable, and
+    concurrent mutations share storage writes through a GroupCommit. Records are
+    queued in order under the entity locks, which are released before waiting.
+    """
+
+    def __init__(self, data_dir: str = 'data', db_class: type = Database,
+                 commit_window_ms: Optional[float] = None, commit_max_batch: int = 256):
+        self._storage_lock = threading.Lock()
+        self._user_locks: Dict[str, threading.Lock] = {}
+        self._vehicle_locks: Dict[str, threading.Lock] = {}
+        self._entity_locks_guard = threading.Lock()
+        self._pending = threading.local()
+        super().__init__(data_dir, db_class)
+        self.state_lock = threading.RLock()
+        self.group_commit = None
+        if commit_window_ms is not None:
+            self.group_commit = GroupCommit(self, commit_window_ms, commit_max_batch)
+
+    @contextmanager
+    def _locked(self, users: List[str] = (), vehicles: List[str] = ()):
+        # Sorted within each kind so two operations can never wait on each other in a cycle
+        keys = ([(self._user_locks, name) for name in sorted(set(users))] +
+                [(self._vehicle_locks, plate) for plate in sorted(set(vehicles))])
+        batch = None
+        with ExitStack() as stack:
+            while True:
+                with self._entity_locks_guard:
+                    locks = [table.setdefault(key, threading.Lock()) for table, key in keys]
+                for lock in locks:
+                    stack.enter_context(lock)
+                # A lock dropped while this thread waited for it no longer guards the entity
+                with self._entity_locks_guard:
+                    if all(table.get(key) is lock for (table, key), lock in zip(keys, locks)):
+                        break
+                stack.close()
+            stack.callback(self._drop_entity_locks, keys)
+            self._pending.entries = []
+            if self.group_commit is not None:
+                self.group_commit.begin()
+            try:
+                yield
+            finally:
+                entries, self._pending.entries = self._pending.entries, None
+                if self.group_commit is not None:
+                    batch = self.group_commit.submit(entries)
+                elif entries:
+                    with self._storage_lock:
+                        self.db.record_many(entries)
+        if entries and batch is not None:
+            self.group_commit.wait(batch)
+
+    def _drop_entity_locks(self, keys: List[tuple]):
+        # Runs while the locks are still held, so nobody can add these entities meanwhile
+        with self._entity_locks_guard:
+            for table, key in keys:
+                entities = self._users_by_name if table is self._user_locks else self._vehicles_by_plate
+                if key not in entities:
+                    del table[key]
+
+    def _store(self, entry: Dict):
+        entries = getattr(self._pending, 'entries', None)
+        if entries is not None:
+            # Written once the state lock is released; see _locked
+            entries.append(entry)
+        elif self.group_commit is not None:
+            self.group_commit.begin()
+            self.group_commit.wait(self.group_commit.submit([entry]))
+        else:
+            with self._storage_lock:
+                self.db.record(entry)
+
+    def _write_batch(self, entries: List[Dict]):
+        with self._storage_lock:
+            self.db.record_many(entries)
+            self._save_snapshot()
+
+    def _save_snapshot(self):
+        self.db.save_snapshot(self.snapshot())
+
+    def add_user(self, user: AbstractUser) -> AbstractUser:
+        with self._locked(users=[user.username]), self.state_lock:
+            return super().add_user(user)
+
+    def rent_vehicle(self, username: str, License_Plate: str, start_date: datetime, end_date: datetime) -> Rental:
+        with self._locked(users=[username], vehicles=[License_Plate]), self.state_lock:
+            return super().rent_vehicle(username, License_Plate, start_date, end_date)
+
+    def return_vehicle(self, username: str) -> None:
+        while True:
+            # The vehicle is only known from current_rental, so check it is unchanged once locked
+            rental = self._get_customer(username).current_rental
+            plates = [rental.vehicle.License_Plate] if rental else []
+            with self._locked(users=[username], vehicles=plates), self.state_lock:
+                if self._get_customer(username).current_rental is rental:
+                    return super().return_vehicle(username)
+
+    def add_funds(self, username: str, amount: float) -> float:
+        with self._locked(users=[username]), self.state_lock:
+            return super().add_funds(username, amount)
+
+    def charge(self, username: str, amount: float) -> float:
+        with self._locked(users=[username]), self.state_lock:
+            return super().charge(username, amount)
+
+    def add_vehicle(self, vehicle_data: Dict) -> Vehicle:
+        with self._locked(vehicles=[vehicle_data['License_Plate']]), self.state_lock:
+            return super().add_vehicle(vehicle_data)
+
+    def remove_vehicle(self, License_Plate: str) -> None:
+        with self._locked(vehicles=[License_Plate]), self.state_lock:
+            super().remove_vehicle(License_Plate)
+
+    def get_active_rentals(self) -> List[Rental]:
+        with self.state_lock:
+            return super().get_active_rentals()
+
+    def get_rentals_due_today(self, now: Optional[datetime] = None) -> List[Rental]:
+        with self.state_lock:
+            return super().get_rentals_due_today(now)
+
+    def get_overdue_rentals(self, now: Optional[datetime] = None) -> List[Rental]:
+        with self.state_lock:
+            return super().get_overdue_rentals(now)
+
+    def get_available_vehicles(self) -> List[Vehicle]:
+        with self.state_lock:
+            return super().get_available_vehicles()
+
+    def search_vehicles(self, *args, **kwargs) -> List[Vehicle]:
+        with self.state_lock:
+            return super().search_vehicles(*args, **kwargs)
+
+    def get_vehicle_bookings(self, License_Plate: str) -> List[Rental]:
+        with self.state_lock:
+            return super().get_vehicle_bookings(License_Plate)
+
+    def get_user_rental_history(self, username: str) -> List[Rental]:
+        with self._storage_lock, self.state_lock:
+            return super().get_user_rental_history(username)
+
+    def get_user_rental_history_page(self, username: str, offset: int = 0, limit: int = 20) -> List[Rental]:
+        with self._storage_lock, self.state_lock:
+            return super().get_user_rental_history_page(username, offset, limit)
+
+    def save(self):
+        if self.on_save:
+            self.on_save()
+            return
+        with self._storage_lock:
+            self._save_snapshot()
+
+    def shutdown(self):
+        if self.group_commit is not None:
+            self.group_commit.shutdown()
+        with self._storage_lock:
+            self._save_snapshot()
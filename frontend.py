@@ -1,12 +1,25 @@
 import sys
-from datetime import datetime
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
 from pathlib import Path
 from PySide6.QtWidgets import *
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QAbstractListModel, QAbstractTableModel, QEvent, QModelIndex, QObject, QRect, QRunnable, QSize, QThreadPool, Signal
 from PySide6.QtGui import *
 from Backend import * 
 
 PROJECT_ROOT = Path(__file__).parent 
+HISTORY_PAGE_SIZE = 20
+HISTORY_PREFETCH_PX = 300
+PIXMAP_CACHE_BUDGET = 64 * 1024 * 1024  # bytes of decoded pixels kept in memory
+REPORT_WINDOW_DAYS = 90
+SORT_OPTIONS = {
+    "Price: low to high": ("daily_rate", False),
+    "Price: high to low": ("daily_rate", True),
+    "Newest first": ("year", True),
+    "Oldest first": ("year", False),
+}
+REPORT_TOP_ROWS = 20
 
 class StyleSheet:
     MAIN_STYLE = """
@@ -63,6 +76,137 @@ class StyleSheet:
         border-radius: 5px;
     }
     """
+class ImageLoadSignals(QObject):
+    finished = Signal(object, QImage)
+
+
+class ImageLoadTask(QRunnable):
+    # QImage (unlike QPixmap) may be decoded and scaled off the GUI thread
+    def __init__(self, key, path, size, transform, signals):
+        super().__init__()
+        self.key = key
+        self.path = path
+        self.size = size
+        self.transform = transform
+        self.signals = signals
+
+    def run(self):
+        image = QImage()
+        if Path(self.path).exists():
+            image = QImage(str(self.path))
+            if not image.isNull():
+                image = image.scaled(self.size, Qt.KeepAspectRatio, self.transform)
+        self.signals.finished.emit(self.key, image)
+
+
+class PixmapCache(QObject):
+    """Decoded and pre-scaled images shared by every view, evicted least recently used first.
+
+    Entries are costed by their pixel data and evicted once the total exceeds
+    budget_bytes. Missing files are cached as None so they are only stat'ed once.
+    Uncached images are decoded on a thread pool: get() returns PENDING and
+    image_ready fires with the key once the pixmap can be fetched.
+    """
+    PENDING = object()
+    image_ready = Signal(object)
+
+    def __init__(self, budget_bytes=PIXMAP_CACHE_BUDGET, pool=None):
+        super().__init__()
+        self.budget_bytes = budget_bytes
+        self.used_bytes = 0
+        self.entries = OrderedDict()
+        self.pending = {}
+        self.pool = pool or QThreadPool.globalInstance()
+        self.hits = 0
+        self.misses = 0
+
+    def car(self, make, model, size):
+        image_path = PROJECT_ROOT / "assets" / "cars" / f"{make.lower()}_{model.lower()}.png"
+        return self.get((make.lower(), model.lower(), size.width(), size.height()), image_path, size)
+
+    def get(self, key, path, size, transform=Qt.SmoothTransformation):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key][0]
+        if key in self.pending:
+            return self.PENDING
+
+        self.misses += 1
+        signals = ImageLoadSignals()
+        signals.finished.connect(self.store)
+        self.pending[key] = signals
+        self.pool.start(ImageLoadTask(key, path, size, transform, signals))
+        return self.PENDING
+
+    def store(self, key, image):
+        self.pending.pop(key, None)
+        pixmap = None if image.isNull() else QPixmap.fromImage(image)
+        cost = pixmap.width() * pixmap.height() * pixmap.depth() // 8 if pixmap is not None else 0
+        self.entries[key] = (pixmap, cost)
+        self.used_bytes += cost
+
+        # Evict the least recently used entries, always keeping the one just added
+        while self.used_bytes > self.budget_bytes and len(self.entries) > 1:
+            _, (_, evicted_cost) = self.entries.popitem(last=False)
+            self.used_bytes -= evicted_cost
+        self.image_ready.emit(key)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self.entries),
+                "pending": len(self.pending), "bytes": self.used_bytes}
+
+
+PIXMAP_CACHE = PixmapCache()
+
+
+class PersistenceWorker(QObject):
+    """Runs Database.save_all on a background thread so the event loop never waits on disk.
+
+    Each request_save() replaces any snapshot that has not been written yet, so a
+    burst of requests results in a single write. shutdown() queues a final snapshot
+    and blocks until it has been flushed.
+    """
+    saved = Signal()
+    failed = Signal(str)
+
+    def __init__(self, system):
+        super().__init__()
+        self.system = system
+        self.condition = threading.Condition()
+        self.snapshot = None
+        self.closing = False
+        self.thread = threading.Thread(target=self.run, name="persistence", daemon=True)
+        self.thread.start()
+
+    def request_save(self):
+        # Taken on the GUI thread; its users and vehicles are copies, so later changes cannot leak into the write
+        with self.condition:
+            self.snapshot = self.system.snapshot()
+            self.condition.notify()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.snapshot is None and not self.closing:
+                    self.condition.wait()
+                if self.snapshot is None:
+                    return
+                snapshot, self.snapshot = self.snapshot, None
+            try:
+                self.system.db.save_snapshot(snapshot)
+                self.saved.emit()
+            except Exception as e:
+                self.failed.emit(str(e))
+
+    def shutdown(self):
+        self.request_save()
+        with self.condition:
+            self.closing = True
+            self.condition.notify()
+        self.thread.join()
+
+
 class RegisterDialog(QDialog):
     def __init__(self, system, parent=None):
         super().__init__(parent)
@@ -170,14 +314,12 @@ class LoginWindow(QWidget):
         welcome_label.setStyleSheet("font-size: 40px; font-weight: bold; color: #1a1a2e;")
         welcome_label.setAlignment(Qt.AlignCenter)
         
-        car_image = QLabel()
-        car_image_path = PROJECT_ROOT / "assets" / "main_car.png"
-        if Path(car_image_path).exists():
-            pixmap = QPixmap(str(car_image_path))
-            car_image.setPixmap(pixmap.scaled(600, 500, Qt.KeepAspectRatio))
+        self.car_image = QLabel()
+        PIXMAP_CACHE.image_ready.connect(self.handle_image_ready)
+        self.show_car_image()
         
         left_layout.addWidget(welcome_label)
-        left_layout.addWidget(car_image)
+        left_layout.addWidget(self.car_image)
         left_layout.addStretch()
         left_widget.setLayout(left_layout)
         
@@ -236,6 +378,16 @@ class LoginWindow(QWidget):
         layout.addWidget(right_widget)
         self.setLayout(layout)
 
+    def show_car_image(self):
+        car_image_path = PROJECT_ROOT / "assets" / "main_car.png"
+        pixmap = PIXMAP_CACHE.get("main_car", car_image_path, QSize(600, 500), Qt.FastTransformation)
+        if pixmap is not None and pixmap is not PIXMAP_CACHE.PENDING:
+            self.car_image.setPixmap(pixmap)
+
+    def handle_image_ready(self, key):
+        if key == "main_car":
+            self.show_car_image()
+
     def handle_login(self):
         try:
             user = self.system.authenticate(
@@ -252,155 +404,256 @@ class LoginWindow(QWidget):
         dialog = RegisterDialog(self.system, self)
         dialog.exec()
 
-class CarCard(QFrame):
-    def __init__(self, car, user, system, parent=None):
+class CarGalleryModel(QAbstractListModel):
+    def __init__(self, vehicles, parent=None):
         super().__init__(parent)
-        self.car = car
-        self.user = user
-        self.system = system
-        self.setObjectName("car-card")
-        self.setStyleSheet("""
-            QFrame#car-card {
-                background-color: #ffffff;
-                border-radius: 10px;
-                min-width: 400px;
-                max-width: 400px;
-            }
-            QLabel {
-                color: #1a1a2e;
-            }
-            QLabel#title {
-                font-size: 20px;
-                font-weight: bold;
-                color: #1a1a2e;
-            }
-            QLabel#price {
-                font-size: 16px;
-                color: #7785AC;
-            }
-            QPushButton {
-                background-color: #7785AC;
-                color: white;
-                border: none;
-                padding: 10px;
-                border-radius: 5px;
-                font-size: 14px;
-                min-width: 120px;
-            }
-            QPushButton:hover {
-                background-color: #5D6B99;
-            }
-        """)
-        self.setup_ui()
+        self.vehicles = vehicles
 
-    def setup_ui(self):
-        main_layout = QVBoxLayout(self)
-        main_layout.setSpacing(10)
-        main_layout.setContentsMargins(15, 15, 15, 15)
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.vehicles)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        vehicle = self.vehicles[index.row()]
+        if role == Qt.DisplayRole:
+            return f"{vehicle.make} {vehicle.model}"
+        if role == Qt.UserRole:
+            return vehicle
+        return None
+
+
+class CarCardDelegate(QStyledItemDelegate):
+    """Paints car cards on demand so only visible vehicles cost any work.
+
+    mode "rent" draws the customer card with a RENT ME! button, "manage" draws the
+    admin card with a Remove Vehicle button and None draws a card without a button.
+    """
+    button_clicked = Signal(object)
+
+    CARD_SIZES = {"manage": QSize(300, 420)}
+    DEFAULT_CARD_SIZE = QSize(430, 480)
+    IMAGE_SIZES = {"manage": QSize(220, 150)}
+    DEFAULT_IMAGE_SIZE = QSize(300, 200)
+
+    def __init__(self, mode=None, parent=None):
+        super().__init__(parent)
+        self.mode = mode
+        self.card_size = self.CARD_SIZES.get(mode, self.DEFAULT_CARD_SIZE)
+        self.image_size = self.IMAGE_SIZES.get(mode, self.DEFAULT_IMAGE_SIZE)
+        self.title_font = QFont("Montserrat")
+        self.title_font.setPixelSize(18 if mode == "manage" else 20)
+        self.title_font.setBold(True)
+        self.text_font = QFont("Montserrat")
+        self.text_font.setPixelSize(14)
+        self.price_font = QFont("Montserrat")
+        self.price_font.setPixelSize(16)
+        self.button_font = QFont("Montserrat")
+        self.button_font.setPixelSize(14)
+        self.button_font.setBold(True)
+
+    def sizeHint(self, option, index):
+        return self.card_size
+
+    def handle_image_ready(self, key):
+        self.parent().viewport().update()
+
+    def card_rect(self, rect):
+        return rect.adjusted(15, 15, -15, -15)
+
+    def button_rect(self, rect):
+        card = self.card_rect(rect)
+        return QRect(card.center().x() - 80, card.bottom() - 60, 160, 40)
+
+    def paint(self, painter, option, index):
+        vehicle = index.data(Qt.UserRole)
+        card = self.card_rect(option.rect)
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        # Card background
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor("#ffffff"))
+        painter.drawRoundedRect(card, 10, 10)
 
         # Car title
-        title = QLabel(f"{self.car.make} {self.car.model}")
-        title.setObjectName("title")
-        title.setAlignment(Qt.AlignCenter)
+        y = card.top() + 15
+        title = f"{vehicle.make} {vehicle.model}"
+        if self.mode == "manage":
+            title += f" ({vehicle.year})"
+        painter.setPen(QColor("#1a1a2e"))
+        painter.setFont(self.title_font)
+        painter.drawText(QRect(card.left(), y, card.width(), 30), Qt.AlignCenter, title)
+        y += 40
 
         # Car image
-        image_label = QLabel()
-        image_path = PROJECT_ROOT / "assets" / "cars" / f"{self.car.make.lower()}_{self.car.model.lower()}.png"
-        if image_path.exists():
-            pixmap = QPixmap(str(image_path))
-            scaled_pixmap = pixmap.scaled(300, 200, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            image_label.setPixmap(scaled_pixmap)
-        image_label.setAlignment(Qt.AlignCenter)
-
-        # Price
-        price = QLabel(f"PKR {self.car.daily_rate}/-")
-        price.setObjectName("price")
-        price.setAlignment(Qt.AlignCenter)
-
-        # Car details
-        details = QLabel(
-            f"Year: {self.car.year}\n"
-            f"Transmission: {self.car.transmission}\n"
-            f"Fuel Type: {self.car.fuel_type}"
-        )
-        details.setAlignment(Qt.AlignCenter)
+        image_area = QRect(card.left(), y, card.width(), self.image_size.height())
+        pixmap = PIXMAP_CACHE.car(vehicle.make, vehicle.model, self.image_size)
+        if pixmap is PIXMAP_CACHE.PENDING:
+            # Placeholder until the thread pool has decoded the image
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(QColor("#e0e0e0"))
+            painter.drawRoundedRect(image_area.adjusted(40, 10, -40, -10), 10, 10)
+        elif pixmap is not None:
+            painter.drawPixmap(image_area.center().x() - pixmap.width() // 2,
+                               image_area.center().y() - pixmap.height() // 2, pixmap)
+        y += self.image_size.height() + 10
 
-        # Add common elements
-        main_layout.addWidget(title)
-        main_layout.addWidget(image_label)
-        main_layout.addWidget(price)
-        main_layout.addWidget(details)
+        # Price and details, or plate and status for car management
+        if self.mode == "manage":
+            painter.setPen(QColor("#1a1a2e"))
+            painter.setFont(self.text_font)
+            painter.drawText(QRect(card.left(), y, card.width(), 25), Qt.AlignCenter,
+                             f"License plate: {vehicle.License_Plate}")
+            painter.setPen(QColor("#7785AC"))
+            painter.drawText(QRect(card.left(), y + 30, card.width(), 25), Qt.AlignCenter,
+                             f"Status: {'Available' if vehicle.is_available else 'Rented'}")
+        else:
+            painter.setPen(QColor("#7785AC"))
+            painter.setFont(self.price_font)
+            painter.drawText(QRect(card.left(), y, card.width(), 25), Qt.AlignCenter, f"PKR {vehicle.daily_rate}/-")
+            painter.setPen(QColor("#1a1a2e"))
+            painter.setFont(self.text_font)
+            painter.drawText(QRect(card.left(), y + 30, card.width(), 75), Qt.AlignHCenter | Qt.AlignTop,
+                             f"Year: {vehicle.year}\n"
+                             f"Transmission: {vehicle.transmission}\n"
+                             f"Fuel Type: {vehicle.fuel_type}")
 
-        # Add rent button ONLY for customers
-        if isinstance(self.user, Customer) and not isinstance(self.user, Admin):  # Make sure this is imported from Backend
-            rent_button = QPushButton("RENT ME!")
-            rent_button.setCursor(Qt.PointingHandCursor)
-            rent_button.clicked.connect(self.handle_rent)
-            main_layout.addWidget(rent_button)
+        # Action button
+        if self.mode is not None:
+            button = self.button_rect(option.rect)
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(QColor("#ff4d4d" if self.mode == "manage" else "#7785AC"))
+            painter.drawRoundedRect(button, 5, 5)
+            painter.setPen(QColor("white"))
+            painter.setFont(self.button_font)
+            painter.drawText(button, Qt.AlignCenter, "Remove Vehicle" if self.mode == "manage" else "RENT ME!")
 
-        main_layout.setAlignment(Qt.AlignCenter)
+        painter.restore()
 
+    def editorEvent(self, event, model, option, index):
+        if (self.mode is not None and event.type() == QEvent.MouseButtonRelease
+                and self.button_rect(option.rect).contains(event.position().toPoint())):
+            self.button_clicked.emit(index.data(Qt.UserRole))
+            return True
+        return super().editorEvent(event, model, option, index)
 
-    def handle_rent(self):
-        if not isinstance(self.user, Customer):
-            QMessageBox.warning(self, "Error", "Only customers can rent cars!")
-            return
-            
-        if self.user.current_rental:
-            QMessageBox.warning(self, "Error", "You already have an active rental!")
-            return
 
-        try:
-            dialog = QDialog(self)
-            dialog.setWindowTitle("Rent Car")
-            dialog.setStyleSheet(StyleSheet.MAIN_STYLE)
-            layout = QFormLayout()
+class ActiveRentalsModel(QAbstractTableModel):
+    """Active rentals table that sorts and filters the full list itself.
 
-            start_date = QCalendarWidget()
-            end_date = QCalendarWidget()
-            
-            start_date.setMinimumDate(datetime.now().date())
-            end_date.setMinimumDate(datetime.now().date())
+    A proxy model would only see the rows fetched so far, so sort() and
+    set_filter() work on every rental and fetchMore() just pages the result
+    into the view.
+    """
+    HEADERS = ["Rental ID", "Customer", "Vehicle", "License_Plate", "Start Date", "End Date", "Days", "Total Cost"]
+    BATCH_SIZE = 200
 
-            layout.addRow("Start Date:", start_date)
-            layout.addRow("End Date:", end_date)
+    def __init__(self, rentals, parent=None):
+        super().__init__(parent)
+        self.all_rentals = list(rentals)
+        self.rentals = self.all_rentals
+        self.loaded = 0
+        self.filter_text = ""
+        self.search_text = None  # Built on the first filter, one lowercase line per rental
+        self.today = datetime.combine(datetime.now().date(), datetime.min.time())
 
-            buttons = QHBoxLayout()
-            confirm = QPushButton("Confirm Rental")
-            cancel = QPushButton("Cancel")
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.loaded
 
-            buttons.addWidget(confirm)
-            buttons.addWidget(cancel)
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
 
-            layout.addRow(buttons)
-            dialog.setLayout(layout)
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.loaded < len(self.rentals)
 
-            def handle_confirm():
-                start = datetime.combine(start_date.selectedDate().toPython(), datetime.min.time())
-                end = datetime.combine(end_date.selectedDate().toPython(), datetime.min.time())
-                
-                try:
-                    rental = self.system.rent_vehicle(self.user.username, self.car.License_Plate, start, end)
-                    QMessageBox.information(self, "Success", 
-                        f"Car rented successfully!\nTotal Cost: PKR {rental.total_cost}/-")
-                    dialog.accept()
-                except Exception as e:
-                    QMessageBox.warning(self, "Error", str(e))
+    def fetchMore(self, parent=QModelIndex()):
+        count = min(self.BATCH_SIZE, len(self.rentals) - self.loaded)
+        self.beginInsertRows(QModelIndex(), self.loaded, self.loaded + count - 1)
+        self.loaded += count
+        self.endInsertRows()
 
-            confirm.clicked.connect(handle_confirm)
-            cancel.clicked.connect(dialog.reject)
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    @staticmethod
+    def display(rental, column):
+        if column == 0:
+            return f"R{rental.id.split('-')[0].upper()}"
+        if column == 1:
+            return f"{rental.user.first_name} {rental.user.last_name}"
+        if column == 2:
+            return f"{rental.vehicle.make} {rental.vehicle.model}"
+        if column == 3:
+            return rental.vehicle.License_Plate
+        if column == 4:
+            return rental.start_date.strftime("%Y-%m-%d")
+        if column == 5:
+            return rental.end_date.strftime("%Y-%m-%d")
+        if column == 6:
+            return str(rental.duration_days)
+        return f"PKR {float(rental.total_cost):,.2f}"
+
+    def sort_key(self, column):
+        # Dates, days and cost sort by value rather than by their formatted text
+        if column == 4:
+            return lambda r: r.start_date
+        if column == 5:
+            return lambda r: r.end_date
+        if column == 6:
+            return lambda r: r.duration_days
+        if column == 7:
+            return lambda r: r.total_cost
+        return lambda r: self.display(r, column).casefold()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.beginResetModel()
+        self.all_rentals.sort(key=self.sort_key(column), reverse=order == Qt.DescendingOrder)
+        self.search_text = None
+        self._apply_filter()
+        self.endResetModel()
+
+    def set_filter(self, text):
+        self.beginResetModel()
+        self.filter_text = text.casefold()
+        self._apply_filter()
+        self.endResetModel()
+
+    def _apply_filter(self):
+        if not self.filter_text:
+            self.rentals = self.all_rentals
+        else:
+            if self.search_text is None:
+                self.search_text = ["\n".join(self.display(r, c) for c in range(len(self.HEADERS))).casefold()
+                                    for r in self.all_rentals]
+            self.rentals = [r for r, text in zip(self.all_rentals, self.search_text) if self.filter_text in text]
+        self.loaded = min(self.BATCH_SIZE, len(self.rentals))
+
+    def data(self, index, role=Qt.DisplayRole):
+        # Cells are formatted only when the view asks for a visible row
+        if not index.isValid():
+            return None
+        rental = self.rentals[index.row()]
+        if role == Qt.DisplayRole:
+            return self.display(rental, index.column())
+        if role == Qt.ForegroundRole:
+            if rental.end_date < self.today:
+                return QColor("#c0392b")  # Overdue
+            if rental.end_date < self.today + timedelta(days=1):
+                return QColor("#d35400")  # Due today
+        return None
 
-            dialog.exec()
 
-        except Exception as e:
-            QMessageBox.warning(self, "Error", str(e))
-            
 class DashboardWindow(QWidget):
     def __init__(self, system, user, stacked_widget):
         super().__init__()
         self.system = system
         self.user = user
         self.stacked_widget = stacked_widget
+        self.booking_range = None  # (start, end) picked in Available Cars
+        self.vehicle_search = {"filters": {}, "sort_by": "daily_rate", "descending": False}
         self.setup_ui()
 
     def setup_ui(self):
@@ -439,6 +692,7 @@ class DashboardWindow(QWidget):
                 ("AVAILABLE CARS", self.show_available_cars),
                 ("CAR MANAGEMENT", self.show_car_management),
                 ("ACTIVE RENTALS", self.show_active_rentals),
+                ("REPORTS", self.show_reports),
                 ("ADD NEW CARS", self.show_add_car)
             ]
         else:
@@ -604,8 +858,12 @@ class DashboardWindow(QWidget):
                 
                 self.content_layout.addWidget(current_rental_frame)
             
-            # Show rental history
-            history = self.system.get_user_rental_history(self.user.username)
+            # Show rental history, one page at a time
+            try:
+                history = self.system.get_user_rental_history_page(self.user.username, 0, HISTORY_PAGE_SIZE)
+            except Exception as e:
+                QMessageBox.warning(self, "Error", str(e))
+                return
             if history:
                 history_label = QLabel("Rental History")
                 history_label.setStyleSheet("""
@@ -642,37 +900,19 @@ class DashboardWindow(QWidget):
                 horizontal_layout = QHBoxLayout(container)
                 horizontal_layout.setSpacing(20)
                 horizontal_layout.setContentsMargins(20, 20, 20, 20)
+                horizontal_layout.addStretch()
                 
-                for rental in history:
-                    history_frame = QFrame()
-                    history_frame.setObjectName("car-card")
-                    history_frame.setStyleSheet("""
-                        QFrame#car-card {
-                            background-color: #ffffff;
-                            border-radius: 10px;
-                            padding: 20px;
-                            margin: 5px;
-                            min-width: 300px;
-                        }
-                        QLabel {
-                            color: #1a1a2e;
-                            margin: 5px 0;
-                        }
-                    """)
-                    layout = QVBoxLayout(history_frame)
-                    
-                    car_label = QLabel(f"Car: {rental.vehicle.make} {rental.vehicle.model}")
-                    date_label = QLabel(f"Date: {rental.start_date.strftime('%Y-%m-%d')} to {rental.end_date.strftime('%Y-%m-%d')}")
-                    cost_label = QLabel(f"Total Cost: PKR {rental.total_cost}/-")
-                    cost_label.setStyleSheet("color: #7785AC; font-weight: bold;")
-                    
-                    layout.addWidget(car_label)
-                    layout.addWidget(date_label)
-                    layout.addWidget(cost_label)
-                    
-                    horizontal_layout.addWidget(history_frame)
+                self.history_layout = horizontal_layout
+                self.history_loaded = 0
+                self.history_exhausted = False
+                self.add_history_cards(history)
+                
+                # Fetch the next page when the user scrolls near the end, or while the view is not yet full
+                scroll_bar = scroll_area.horizontalScrollBar()
+                scroll_bar.valueChanged.connect(self.handle_history_scroll)
+                scroll_bar.rangeChanged.connect(lambda minimum, maximum: self.handle_history_scroll(scroll_bar.value()))
+                self.history_scroll_bar = scroll_bar
                 
-                horizontal_layout.addStretch()
                 scroll_area.setWidget(container)
                 self.content_layout.addWidget(scroll_area)
             else:
@@ -685,6 +925,55 @@ class DashboardWindow(QWidget):
                 no_history_label.setAlignment(Qt.AlignCenter)
                 self.content_layout.addWidget(no_history_label)
     
+    def add_history_cards(self, rentals):
+        for rental in rentals:
+            history_frame = QFrame()
+            history_frame.setObjectName("car-card")
+            history_frame.setStyleSheet("""
+                QFrame#car-card {
+                    background-color: #ffffff;
+                    border-radius: 10px;
+                    padding: 20px;
+                    margin: 5px;
+                    min-width: 300px;
+                }
+                QLabel {
+                    color: #1a1a2e;
+                    margin: 5px 0;
+                }
+            """)
+            layout = QVBoxLayout(history_frame)
+            
+            car_label = QLabel(f"Car: {rental.vehicle.make} {rental.vehicle.model}")
+            date_label = QLabel(f"Date: {rental.start_date.strftime('%Y-%m-%d')} to {rental.end_date.strftime('%Y-%m-%d')}")
+            cost_label = QLabel(f"Total Cost: PKR {rental.total_cost}/-")
+            cost_label.setStyleSheet("color: #7785AC; font-weight: bold;")
+            
+            layout.addWidget(car_label)
+            layout.addWidget(date_label)
+            layout.addWidget(cost_label)
+            
+            # Keep the trailing stretch last
+            self.history_layout.insertWidget(self.history_layout.count() - 1, history_frame)
+        
+        self.history_loaded += len(rentals)
+        if len(rentals) < HISTORY_PAGE_SIZE:
+            self.history_exhausted = True
+
+    def handle_history_scroll(self, value):
+        if self.history_exhausted:
+            return
+        if value < self.history_scroll_bar.maximum() - HISTORY_PREFETCH_PX:
+            return
+        try:
+            page = self.system.get_user_rental_history_page(self.user.username, self.history_loaded, HISTORY_PAGE_SIZE)
+        except Exception as e:
+            # Stop paging, or every scroll event would raise the same error again
+            self.history_exhausted = True
+            QMessageBox.warning(self, "Error", str(e))
+            return
+        self.add_history_cards(page)
+
     def show_active_rentals(self):
         #Clear existing content
         self.clear_content()
@@ -702,10 +991,23 @@ class DashboardWindow(QWidget):
         """)
         layout.addWidget(header)
         
+        # One snapshot, so the counts and the table describe the same moment
+        snapshot = self.system.snapshot()
+        due_today = len(snapshot.get_rentals_due_today())
+        overdue = len(snapshot.get_overdue_rentals())
+        summary = QLabel(f"{due_today} due today, {overdue} overdue")
+        summary.setStyleSheet("font-size: 16px; color: #1a1a2e; margin: 0 20px;")
+        layout.addWidget(summary)
+        
+        # Filter box searching every column
+        search = QLineEdit()
+        search.setPlaceholderText("Filter by customer, vehicle, plate or date")
+        layout.addWidget(search)
+        
         # Create table
-        table = QTableWidget()
+        table = QTableView()
         table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 border: none;
                 background-color: white;
                 padding: 10px;
@@ -717,57 +1019,116 @@ class DashboardWindow(QWidget):
                 border: none;
                 font-size: 14px;
             }
-            QTableWidget::item {
+            QTableView::item {
                 color: #1a1a2e;
                 font-size: 14px;
                 padding: 8px;
             }
         """)
         
-        # Set up table
-        active_rentals = self.system.get_active_rentals()
-        table.setColumnCount(8)
-        table.setRowCount(len(active_rentals))
-        
-        # Set headers
-        headers = ["Rental ID", "Customer", "Vehicle", "License_Plate", "Start Date", "End Date", "Days", "Total Cost"]
-        table.setHorizontalHeaderLabels(headers)
-        
-        # Populate table
-        for row, rental in enumerate(active_rentals):
-            #Generate rental ID
-            rental_id = f"R{rental.id.split('-')[0].upper()}"
-            
-            table.setItem(row, 0, QTableWidgetItem(rental_id))
-            table.setItem(row, 1, QTableWidgetItem(f"{rental.user.first_name} {rental.user.last_name}"))
-            table.setItem(row, 2, QTableWidgetItem(f"{rental.vehicle.make} {rental.vehicle.model}"))
-            table.setItem(row, 3, QTableWidgetItem(f"{rental.vehicle.License_Plate}"))
-            table.setItem(row, 4, QTableWidgetItem(rental.start_date.strftime("%Y-%m-%d")))
-            table.setItem(row, 5, QTableWidgetItem(rental.end_date.strftime("%Y-%m-%d")))
-            table.setItem(row, 6, QTableWidgetItem(str(rental.duration_days)))
-            table.setItem(row, 7, QTableWidgetItem(f"PKR {float(rental.total_cost):,.2f}"))
-        
-        table.resizeColumnsToContents()
+        # Set up model; it sorts and filters every rental, and the view only formats the rows it shows
+        model = ActiveRentalsModel(snapshot.get_active_rentals(), table)
+        search.textChanged.connect(model.set_filter)
+        table.setModel(model)
+        table.setSortingEnabled(True)
+        table.sortByColumn(5, Qt.AscendingOrder)  # Soonest end date first
         
         table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)  # Auto-stretch columns
         table.verticalHeader().setVisible(False)
+        table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)  # Uniform row heights
+        table.verticalHeader().setDefaultSectionSize(40)
         table.setEditTriggers(QAbstractItemView.NoEditTriggers)
-        table.setSizeAdjustPolicy(QAbstractScrollArea.AdjustToContents)
-        table.resizeRowsToContents()  # Auto-adjust row heights
-        
-        # Set minimum column widths
-        table.setColumnWidth(0, 120)  # Rental ID
-        table.setColumnWidth(1, 120)  # Customer
-        table.setColumnWidth(2, 120)  # Vehicle
-        table.setColumnWidth(3, 120)  # License_Plate
-        table.setColumnWidth(4, 120)  # Start Date
-        table.setColumnWidth(5, 120)  # End Date
-        table.setColumnWidth(6, 80)   # Days
-        table.setColumnWidth(7, 120)  # Total Cost
+        table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        table.setMinimumHeight(500)
         
         layout.addWidget(table)
         active_rentals_widget.setLayout(layout)
         self.content_layout.addWidget(active_rentals_widget)
+
+    def show_reports(self):
+        self.clear_content()
+        try:
+            from analytics import RentalAnalytics
+        except ImportError:
+            QMessageBox.warning(self, "Error", "Reports need NumPy installed (pip install numpy)")
+            return
+        
+        analytics = RentalAnalytics.from_system(self.system)
+        today = datetime.now().date()
+        fleet_utilization, vehicle_utilization = analytics.utilization(today - timedelta(days=REPORT_WINDOW_DAYS), today)
+        
+        reports_widget = QWidget()
+        layout = QVBoxLayout()
+        
+        header = QLabel("Reports")
+        header.setStyleSheet("""
+            font-size: 24px;
+            font-weight: bold;
+            color: #1a1a2e;
+            margin: 20px;
+        """)
+        layout.addWidget(header)
+        
+        summary = QLabel(
+            f"Total revenue: PKR {analytics.total_revenue():,.2f}/-    "
+            f"Average rental: {analytics.average_duration():.1f} days    "
+            f"Fleet utilization (last {REPORT_WINDOW_DAYS} days): {fleet_utilization:.0%}")
+        summary.setStyleSheet("font-size: 16px; color: #1a1a2e; margin: 0 20px;")
+        layout.addWidget(summary)
+        
+        # Aggregates are small, so plain table widgets are enough here
+        grid = QGridLayout()
+        grid.addWidget(self.create_report_table(
+            "Revenue by Make", ["Make", "Revenue (PKR)"],
+            [(make, f"{revenue:,.2f}") for make, revenue in analytics.revenue_per_make()]), 0, 0)
+        grid.addWidget(self.create_report_table(
+            "Revenue by Month", ["Month", "Revenue (PKR)"],
+            [(month, f"{revenue:,.2f}") for month, revenue in analytics.revenue_per_month()]), 0, 1)
+        grid.addWidget(self.create_report_table(
+            "Top Vehicles", ["Plate", "Vehicle", "Revenue (PKR)"],
+            [(plate, name, f"{revenue:,.2f}")
+             for plate, name, revenue in analytics.revenue_per_vehicle()[:REPORT_TOP_ROWS]]), 1, 0)
+        grid.addWidget(self.create_report_table(
+            f"Utilization (last {REPORT_WINDOW_DAYS} days)", ["Plate", "Utilization"],
+            [(plate, f"{share:.0%}") for plate, share in vehicle_utilization[:REPORT_TOP_ROWS]]), 1, 1)
+        layout.addLayout(grid)
+        
+        reports_widget.setLayout(layout)
+        self.content_layout.addWidget(reports_widget)
+        
+    def create_report_table(self, title, headers, rows):
+        frame = QFrame()
+        layout = QVBoxLayout(frame)
+        label = QLabel(title)
+        label.setStyleSheet("font-size: 18px; font-weight: bold; color: #1a1a2e;")
+        layout.addWidget(label)
+        
+        table = QTableWidget(len(rows), len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setStyleSheet("""
+            QTableWidget {
+                border: none;
+                background-color: white;
+            }
+            QHeaderView::section {
+                background-color: #1a1a2e;
+                color: white;
+                padding: 6px;
+                border: none;
+            }
+            QTableWidget::item {
+                color: #1a1a2e;
+            }
+        """)
+        for row, values in enumerate(rows):
+            for column, value in enumerate(values):
+                table.setItem(row, column, QTableWidgetItem(str(value)))
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        table.verticalHeader().setVisible(False)
+        table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        table.setMinimumHeight(220)
+        layout.addWidget(table)
+        return frame
         
     
     def show_funds(self):
@@ -862,21 +1223,140 @@ class DashboardWindow(QWidget):
     
     def show_available_cars(self):
         self.clear_content()
-        cars = self.system.get_available_vehicles()
+        self.content_layout.addWidget(self.create_date_bar())
+        self.content_layout.addWidget(self.create_filter_bar())
+        results = QWidget()
+        self.car_results = QVBoxLayout(results)
+        self.car_results.setContentsMargins(0, 0, 0, 0)
+        self.content_layout.addWidget(results)
+        self.refresh_available_cars()
+
+    def refresh_available_cars(self):
+        # Only the results are rebuilt, so filter widgets keep their focus while editing
+        for i in reversed(range(self.car_results.count())):
+            self.car_results.itemAt(i).widget().deleteLater()
+        start, end = self.booking_range or (None, None)
+        cars = self.system.search_vehicles(start=start, end=end, **self.vehicle_search)
         
         if not cars:
-            no_cars_label = QLabel("No cars available at the moment.")
+            no_cars_label = QLabel("No cars match these dates and filters." if self.booking_range
+                                   or self.vehicle_search["filters"] else "No cars available at the moment.")
             no_cars_label.setAlignment(Qt.AlignCenter)
-            self.content_layout.addWidget(no_cars_label)
+            self.car_results.addWidget(no_cars_label)
             return
         
-        # Create scroll area
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
-        scroll_area.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        scroll_area.setStyleSheet("""
-            QScrollArea {
+        # Customers get the RENT ME! action, admins just browse
+        mode = "rent" if isinstance(self.user, Customer) else None
+        self.car_results.addWidget(self.create_car_gallery(cars, mode, self.handle_rent_vehicle))
+
+    def create_filter_bar(self):
+        filter_bar = QFrame()
+        layout = QHBoxLayout(filter_bar)
+        search = self.vehicle_search
+        
+        def set_filter(field_name, value):
+            search["filters"][field_name] = value
+            self.refresh_available_cars()
+        
+        for label, field_name in (("Make:", "make"), ("Gearbox:", "transmission"), ("Fuel:", "fuel_type"),
+                                  ("Seats:", "seating")):
+            combo = QComboBox()
+            combo.addItem("Any", None)
+            for value in self.system.get_vehicle_options(field_name):
+                combo.addItem(str(value), value)
+            combo.setCurrentIndex(max(combo.findData(search["filters"].get(field_name)), 0))
+            combo.currentIndexChanged.connect(
+                lambda _, combo=combo, field_name=field_name: set_filter(field_name, combo.currentData()))
+            layout.addWidget(QLabel(label))
+            layout.addWidget(combo)
+        
+        # The lowest value of each spin box stands for "no limit"
+        max_rate = QSpinBox()
+        max_rate.setRange(0, 1_000_000)
+        max_rate.setSingleStep(500)
+        max_rate.setSpecialValueText("Any")
+        max_rate.setValue(int(search.get("max_rate") or 0))
+        min_year = QSpinBox()
+        min_year.setRange(1999, 2025)
+        min_year.setSpecialValueText("Any")
+        min_year.setValue(search.get("min_year") or 1999)
+        
+        def set_limits():
+            search["max_rate"] = max_rate.value() or None
+            search["min_year"] = min_year.value() if min_year.value() > 1999 else None
+            self.refresh_available_cars()
+        
+        max_rate.valueChanged.connect(set_limits)
+        min_year.valueChanged.connect(set_limits)
+        layout.addWidget(QLabel("Max PKR/day:"))
+        layout.addWidget(max_rate)
+        layout.addWidget(QLabel("From year:"))
+        layout.addWidget(min_year)
+        
+        sort = QComboBox()
+        for label, order in SORT_OPTIONS.items():
+            sort.addItem(label, order)
+        sort.setCurrentIndex(list(SORT_OPTIONS.values()).index((search["sort_by"], search["descending"])))
+        
+        def set_sort():
+            search["sort_by"], search["descending"] = sort.currentData()
+            self.refresh_available_cars()
+        
+        sort.currentIndexChanged.connect(set_sort)
+        layout.addWidget(QLabel("Sort:"))
+        layout.addWidget(sort)
+        layout.addStretch()
+        return filter_bar
+
+    def create_date_bar(self):
+        # Picking dates lists cars free for that range, including ones booked at other times
+        date_bar = QFrame()
+        layout = QHBoxLayout(date_bar)
+        today = datetime.now().date()
+        start, end = self.booking_range or (None, None)
+        
+        from_date = QDateEdit(start.date() if start else today)
+        to_date = QDateEdit(end.date() if end else today + timedelta(days=1))
+        for date_edit in (from_date, to_date):
+            date_edit.setCalendarPopup(True)
+            date_edit.setMinimumDate(today)
+        check = QPushButton("CHECK DATES")
+        clear = QPushButton("ALL DATES")
+        
+        def handle_check():
+            start = datetime.combine(from_date.date().toPython(), datetime.min.time())
+            end = datetime.combine(to_date.date().toPython(), datetime.min.time())
+            if end <= start:
+                QMessageBox.warning(self, "Error", "End date must be after start date")
+                return
+            self.booking_range = (start, end)
+            self.show_available_cars()
+        
+        def handle_clear():
+            self.booking_range = None
+            self.show_available_cars()
+        
+        check.clicked.connect(handle_check)
+        clear.clicked.connect(handle_clear)
+        layout.addWidget(QLabel("From:"))
+        layout.addWidget(from_date)
+        layout.addWidget(QLabel("To:"))
+        layout.addWidget(to_date)
+        layout.addWidget(check)
+        layout.addWidget(clear)
+        layout.addStretch()
+        return date_bar
+
+    def create_car_gallery(self, vehicles, mode, handler):
+        gallery = QListView()
+        gallery.setFlow(QListView.LeftToRight)
+        gallery.setWrapping(False)
+        gallery.setUniformItemSizes(True)
+        gallery.setHorizontalScrollMode(QAbstractItemView.ScrollPerPixel)
+        gallery.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        gallery.setSelectionMode(QAbstractItemView.NoSelection)
+        gallery.setStyleSheet("""
+            QListView {
                 border: none;
                 background-color: #f0f0f0;
             }
@@ -890,21 +1370,14 @@ class DashboardWindow(QWidget):
                 border-radius: 5px;
             }
         """)
-
-        # Create container for cards
-        container = QWidget()
-        horizontal_layout = QHBoxLayout(container)
-        horizontal_layout.setSpacing(20)
-        horizontal_layout.setContentsMargins(20, 20, 20, 20)
         
-        # Add car cards
-        for car in cars:
-            car_card = CarCard(car, self.user, self.system)
-            horizontal_layout.addWidget(car_card)
-        
-        horizontal_layout.addStretch()
-        scroll_area.setWidget(container)
-        self.content_layout.addWidget(scroll_area)
+        delegate = CarCardDelegate(mode, gallery)
+        delegate.button_clicked.connect(handler)
+        PIXMAP_CACHE.image_ready.connect(delegate.handle_image_ready)
+        gallery.setModel(CarGalleryModel(vehicles, gallery))
+        gallery.setItemDelegate(delegate)
+        gallery.setFixedHeight(delegate.card_size.height() + 20)
+        return gallery
 
     def show_car_management(self):
         if not isinstance(self.user, Admin):
@@ -913,84 +1386,76 @@ class DashboardWindow(QWidget):
             
         self.clear_content()
         
-        # Create scroll area
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
-        scroll_area.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        scroll_area.setStyleSheet("""
-            QScrollArea {
-                border: none;
-                background-color: #f0f0f0;
-            }
-            QScrollBar:horizontal {
-                height: 10px;
-                background: #f0f0f0;
-            }
-            QScrollBar::handle:horizontal {
-                background: #7785AC;
-                min-width: 20px;
-                border-radius: 5px;
-            }
-        """)
+        self.content_layout.addWidget(
+            self.create_car_gallery(self.system.snapshot().vehicles, "manage", self.handle_remove_vehicle))
 
-        # Create container for cards
-        container = QWidget()
-        horizontal_layout = QHBoxLayout(container)
-        horizontal_layout.setSpacing(20)
-        horizontal_layout.setContentsMargins(20, 20, 20, 20)
-        
-        # Add car cards
-        for vehicle in self.system.vehicles:
-            car_frame = QFrame()
-            car_frame.setObjectName("car-card")
-            layout = QVBoxLayout(car_frame)  # Added parent widget to layout
-            
-            # Car Image Container
-            image_container = QFrame()
-            image_container.setObjectName("image-container")
-            image_layout = QVBoxLayout(image_container)
-            
-            # Car Image
-            image_label = QLabel()
-            image_path = PROJECT_ROOT / "assets" / "cars" / f"{vehicle.make.lower()}_{vehicle.model.lower()}.png"
-            if Path(image_path).exists():
-                pixmap = QPixmap(str(image_path))
-                scaled_pixmap = pixmap.scaled(220, 150, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                image_label.setPixmap(scaled_pixmap)
-            image_label.setAlignment(Qt.AlignCenter)
-            image_layout.addWidget(image_label)
-            
-            # Car details
-            title = QLabel(f"{vehicle.make} {vehicle.model} ({vehicle.year})")
-            title.setStyleSheet("color: #1a1a2e; font-size: 18px; font-weight: bold;")
-            title.setAlignment(Qt.AlignCenter)
-            
-            License_Plate = QLabel(f"License plate: {vehicle.License_Plate}")
-            License_Plate.setStyleSheet("color: #1a1a2e;")
-            License_Plate.setAlignment(Qt.AlignCenter)
-            
-            status = QLabel(f"Status: {'Available' if vehicle.is_available else 'Rented'}")
-            status.setStyleSheet("color: #7785AC;")
-            status.setAlignment(Qt.AlignCenter)
+    def handle_rent_vehicle(self, vehicle):
+        if not isinstance(self.user, Customer):
+            QMessageBox.warning(self, "Error", "Only customers can rent cars!")
+            return
             
-            # Remove button
-            remove_btn = QPushButton("Remove Vehicle")
-            remove_btn.setStyleSheet("background-color: #ff4d4d; color: white; font-weight: bold;")
-            remove_btn.clicked.connect(lambda checked, v=vehicle: self.handle_remove_vehicle(v))
+        if self.user.current_rental:
+            QMessageBox.warning(self, "Error", "You already have an active rental!")
+            return
+
+        try:
+            dialog = QDialog(self)
+            dialog.setWindowTitle("Rent Car")
+            dialog.setStyleSheet(StyleSheet.MAIN_STYLE)
+            layout = QFormLayout()
+
+            start_date = QCalendarWidget()
+            end_date = QCalendarWidget()
             
-            # Add widgets to layout
-            layout.addWidget(title)
-            layout.addWidget(image_container)
-            layout.addWidget(License_Plate)
-            layout.addWidget(status)
-            layout.addWidget(remove_btn)
+            start_date.setMinimumDate(datetime.now().date())
+            end_date.setMinimumDate(datetime.now().date())
+            if self.booking_range:
+                start_date.setSelectedDate(self.booking_range[0].date())
+                end_date.setSelectedDate(self.booking_range[1].date())
             
-            horizontal_layout.addWidget(car_frame)
-        
-        horizontal_layout.addStretch()
-        scroll_area.setWidget(container)
-        self.content_layout.addWidget(scroll_area)
+            # Shade days already booked by other customers
+            booked = QTextCharFormat()
+            booked.setBackground(QColor("#f4c7c3"))
+            for booking in self.system.get_vehicle_bookings(vehicle.License_Plate):
+                day = booking.start_date.date()
+                while day < booking.end_date.date():
+                    start_date.setDateTextFormat(day, booked)
+                    end_date.setDateTextFormat(day, booked)
+                    day += timedelta(days=1)
+
+            layout.addRow("Start Date:", start_date)
+            layout.addRow("End Date:", end_date)
+
+            buttons = QHBoxLayout()
+            confirm = QPushButton("Confirm Rental")
+            cancel = QPushButton("Cancel")
+
+            buttons.addWidget(confirm)
+            buttons.addWidget(cancel)
+
+            layout.addRow(buttons)
+            dialog.setLayout(layout)
+
+            def handle_confirm():
+                start = datetime.combine(start_date.selectedDate().toPython(), datetime.min.time())
+                end = datetime.combine(end_date.selectedDate().toPython(), datetime.min.time())
+                
+                try:
+                    rental = self.system.rent_vehicle(self.user.username, vehicle.License_Plate, start, end)
+                    QMessageBox.information(self, "Success", 
+                        f"Car rented successfully!\nTotal Cost: PKR {rental.total_cost}/-")
+                    dialog.accept()
+                except Exception as e:
+                    QMessageBox.warning(self, "Error", str(e))
+
+            confirm.clicked.connect(handle_confirm)
+            cancel.clicked.connect(dialog.reject)
+
+            dialog.exec()
+
+        except Exception as e:
+            QMessageBox.warning(self, "Error", str(e))
+
     def handle_remove_vehicle(self, vehicle):
         try:
             if QMessageBox.question(self, "Confirm Removal", 
@@ -1124,8 +1589,8 @@ class DashboardWindow(QWidget):
         )
         
         if reply == QMessageBox.Yes:
-            # Save system state
-            self.system.shutdown()
+            # Save system state in the background
+            self.system.save()
             # Switch back to login window
             self.stacked_widget.setCurrentIndex(0)
             # Clear login fields
@@ -1149,8 +1614,12 @@ class MainWindow(QMainWindow):
         QFontDatabase.addApplicationFont(str(font_id_bold))
         
         
-        # Initialize the car rental system
+        # Initialize the car rental system with saves handled off the GUI thread
         self.system = CarRentalSystem()
+        self.persistence = PersistenceWorker(self.system)
+        self.persistence.saved.connect(lambda: self.statusBar().showMessage("All changes saved", 3000))
+        self.persistence.failed.connect(self.handle_save_failed)
+        self.system.on_save = self.persistence.request_save
         
         # Add default admin if none exists
         if not any(isinstance(user, Admin) for user in self.system.users):
@@ -1163,8 +1632,8 @@ class MainWindow(QMainWindow):
                 phone="1234567890",
                 address="Admin Office"
             )
-            self.system.users.append(admin)
-            self.system.db.save_all(self.system.users, self.system.vehicles, self.system.rentals)
+            self.system.add_user(admin)
+            self.system.save()
         
         # Create stacked widget
         self.stacked_widget = QStackedWidget()
@@ -1177,8 +1646,12 @@ class MainWindow(QMainWindow):
         # Apply stylesheet
         self.setStyleSheet(StyleSheet.MAIN_STYLE)
 
+    def handle_save_failed(self, message):
+        QMessageBox.warning(self, "Error", f"Failed to save data: {message}")
+
     def closeEvent(self, event):
-        self.system.shutdown()
+        # Wait for the final flush before the window goes away
+        self.persistence.shutdown()
         event.accept()
 
 if __name__ == "__main__":
@@ -0,0 +1,302 @@
+import dataclasses
+import heapq
+import json
+import multiprocessing
+import queue
+import sys
+import threading
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import Backend
+from Backend import (ActiveRentalExistsError, CarRentalError, CarRentalSystem, Customer, Database, DatabaseError,
+                     InvalidUserError, JournalDatabase, NoActiveRentalError, Rental, Vehicle)
+from concurrent_system import ThreadSafeCarRentalSystem
+
+MANIFEST = 'shards.json'
+
+
+def plate_hash(License_Plate: str, shards: int) -> int:
+    # crc32 rather than hash(), which is salted differently in every process
+    return zlib.crc32(License_Plate.encode('utf-8')) % shards
+
+
+def split_data_dir(data_dir: str, target_dir: str, shards: int,
+                   partition: Callable[[str, int], int] = plate_hash) -> None:
+    """One-shot split of a data directory into accounts/ and shard-<n>/ directories.
+
+    accounts/ keeps every user and balance. Each shard gets its vehicles, their
+    rentals and the customers who made those rentals.
+    """
+    system = CarRentalSystem(data_dir)
+    target = Path(target_dir)
+    target.mkdir(parents=True, exist_ok=True)
+    fleet = system._stored_vehicles()
+    owner = {v.License_Plate: partition(v.License_Plate, shards) for v in fleet}
+    for rental in system.rentals:
+        owner.setdefault(rental.vehicle.License_Plate, partition(rental.vehicle.License_Plate, shards))
+
+    accounts = [dataclasses.replace(u, current_rental=None, rental_history=[]) if isinstance(u, Customer) else u
+                for u in system.users]
+    Database(None, str(target / 'accounts')).save_all(accounts, [], [])
+
+    for shard in range(shards):
+        vehicles = [v for v in fleet if owner[v.License_Plate] == shard]
+        rentals = [r for r in system.rentals if owner[r.vehicle.License_Plate] == shard]
+        renters = {r.user.username for r in rentals}
+        customers = [dataclasses.replace(
+            u, _balance=0.0,
+            current_rental=u.current_rental if u.current_rental and owner[u.current_rental.vehicle.License_Plate] == shard else None,
+            rental_history=[r for r in u.rental_history if owner[r.vehicle.License_Plate] == shard])
+            for u in system.users if isinstance(u, Customer) and u.username in renters]
+        Database(None, str(target / f'shard-{shard}')).save_all(customers, vehicles, rentals)
+
+    with open(target / MANIFEST, 'w') as f:
+        json.dump({"shards": shards}, f)
+
+
+def _wire_rental(rental: Rental) -> Dict:
+    # Dates go over the pipe as text so Database._decode_rental reads them like a file
+    return dict(Database._encode_rental(rental), start_date=rental.start_date.isoformat(),
+                end_date=rental.end_date.isoformat())
+
+
+class RentalShard(ThreadSafeCarRentalSystem):
+    """One partition of the fleet, run in its own process by ShardedCarRentalSystem.
+
+    Customers here only own rentals. Their balance belongs to the router, which
+    passes it in with each booking and serialises each customer's calls.
+    """
+
+    def book(self, username: str, License_Plate: str, start_date: datetime, end_date: datetime,
+             balance: float) -> tuple:
+        customer = self.get_user(username)
+        if customer is None:
+            customer = self.add_user(Customer(username=username, password='', first_name='', last_name='',
+                                              email='', phone='', address=''))
+        customer._balance = balance
+        rental = self.rent_vehicle(username, License_Plate, start_date, end_date)
+        return _wire_rental(rental), Database._encode_vehicle(rental.vehicle)
+
+    def release(self, username: str) -> None:
+        self.return_vehicle(username)
+
+    def add(self, vehicle_data: Dict) -> Dict:
+        return Database._encode_vehicle(self.add_vehicle(vehicle_data))
+
+    def available(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                  filters: Optional[Dict[str, Any]] = None) -> List[Dict]:
+        # Both lists are cheapest first, so the router can merge shards without re-sorting
+        if start is None:
+            vehicles = sorted(self.get_available_vehicles(), key=lambda v: v.daily_rate)
+        else:
+            vehicles = self.find_available(start, end, filters)
+        return [Database._encode_vehicle(v) for v in vehicles]
+
+    def active(self) -> List[tuple]:
+        return [(_wire_rental(r), Database._encode_vehicle(r.vehicle)) for r in self.get_active_rentals()]
+
+
+SHARD_CALLS = ('book', 'release', 'add', 'remove_vehicle', 'available', 'active')
+
+
+def _serve_shard(shard_dir: str, db_class: type, connections: list):
+    shard = RentalShard(shard_dir, db_class=db_class)
+
+    def serve(connection):
+        while True:
+            try:
+                method, args = connection.recv()
+            except EOFError:
+                # The router closed its end; see ShardedCarRentalSystem.shutdown
+                return
+            try:
+                if method not in SHARD_CALLS:
+                    raise CarRentalError(f"Unknown shard call {method}")
+                connection.send((True, getattr(shard, method)(*args)))
+            except CarRentalError as e:
+                connection.send((False, (type(e).__name__, str(e))))
+            except Exception as e:
+                connection.send((False, ('DatabaseError', f"Shard error: {e!r}")))
+
+    threads = [threading.Thread(target=serve, args=(c,), daemon=True) for c in connections]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    shard.shutdown()
+
+
+def _shard_error(name: str, message: str) -> CarRentalError:
+    # Rebuilt by name because most CarRentalError subclasses take other constructor arguments
+    cls = getattr(Backend, name, CarRentalError)
+    if not (isinstance(cls, type) and issubclass(cls, CarRentalError)):
+        cls = CarRentalError
+    error = cls.__new__(cls)
+    CarRentalError.__init__(error, message)
+    return error
+
+
+class ShardedCarRentalSystem:
+    """Fleet partitioned across worker processes, behind a CarRentalSystem-like router.
+
+    Each shard process owns the vehicles that partition(License_Plate, shards)
+    assigns to it, plus their bookings and rentals. Accounts and balances stay
+    in this process. rent_vehicle, return_vehicle, add_vehicle and
+    remove_vehicle go to the owning shard. Availability and active-rental queries
+    are sent to every shard at once and merged. Pass a partition that looks up
+    the branch for a plate to shard by branch instead of by hash.
+
+    A booking is stored by its shard before the router charges it, so a crash
+    between the two writes leaves that one booking unpaid.
+    """
+
+    def __init__(self, data_dir: str, db_class: type = JournalDatabase, connections: int = 4,
+                 partition: Callable[[str, int], int] = plate_hash):
+        root = Path(data_dir)
+        try:
+            with open(root / MANIFEST) as f:
+                self.shard_count = json.load(f)['shards']
+        except (OSError, ValueError, KeyError) as e:
+            raise DatabaseError(f"Failed to read {MANIFEST}; run split_data_dir first: {str(e)}")
+        self.partition = partition
+        self.accounts = ThreadSafeCarRentalSystem(str(root / 'accounts'), db_class=db_class)
+        self._user_locks: Dict[str, threading.Lock] = {}
+
+        context = multiprocessing.get_context('spawn')
+        self._pools: List[queue.SimpleQueue] = []
+        self._processes = []
+        for shard in range(self.shard_count):
+            pipes = [context.Pipe() for _ in range(connections)]
+            process = context.Process(target=_serve_shard, name=f"shard-{shard}", daemon=True,
+                                      args=(str(root / f'shard-{shard}'), db_class, [child for _, child in pipes]))
+            process.start()
+            pool = queue.SimpleQueue()
+            for parent, child in pipes:
+                child.close()
+                pool.put(parent)
+            self._pools.append(pool)
+            self._processes.append(process)
+
+        # Which plate each customer has out, so returns go straight to the right shard
+        self._renting: Dict[str, str] = {data['user']: data['vehicle']
+                                         for result in self._fan_out('active') for data, _ in result}
+
+    def _shard_of(self, License_Plate: str) -> int:
+        return self.partition(License_Plate, self.shard_count)
+
+    def _call(self, shard: int, method: str, *args):
+        pool = self._pools[shard]
+        connection = pool.get()
+        try:
+            connection.send((method, args))
+            ok, result = connection.recv()
+        finally:
+            pool.put(connection)
+        if not ok:
+            raise _shard_error(*result)
+        return result
+
+    def _fan_out(self, method: str, *args) -> List[list]:
+        # Every shard works on the request at the same time; one result list per shard, in shard order
+        connections = [pool.get() for pool in self._pools]
+        try:
+            for connection in connections:
+                connection.send((method, args))
+            replies = [connection.recv() for connection in connections]
+        finally:
+            for pool, connection in zip(self._pools, connections):
+                pool.put(connection)
+        results = []
+        for ok, result in replies:
+            if not ok:
+                raise _shard_error(*result)
+            results.append(result)
+        return results
+
+    def _merge_available(self, *args) -> List[Vehicle]:
+        # Each shard answers cheapest first, so a k-way merge orders the whole fleet by daily_rate
+        merged = heapq.merge(*self._fan_out('available', *args), key=lambda data: data['daily_rate'])
+        return [Database._decode_vehicle(data) for data in merged]
+
+    def _user_lock(self, username: str) -> threading.Lock:
+        return self._user_locks.setdefault(username, threading.Lock())
+
+    def _customer(self, username: str) -> Customer:
+        user = self.accounts.get_user(username)
+        if not isinstance(user, Customer):
+            raise InvalidUserError()
+        return user
+
+    def get_user(self, username: str):
+        return self.accounts.get_user(username)
+
+    def authenticate(self, username: str, password: str):
+        return self.accounts.authenticate(username, password)
+
+    def register_user(self, user_data: dict) -> Customer:
+        return self.accounts.register_user(user_data)
+
+    def add_funds(self, username: str, amount: float) -> float:
+        with self._user_lock(username):
+            return self.accounts.add_funds(username, amount)
+
+    def rent_vehicle(self, username: str, License_Plate: str, start_date: datetime, end_date: datetime) -> Rental:
+        with self._user_lock(username):
+            customer = self._customer(username)
+            if username in self._renting:
+                raise ActiveRentalExistsError(username)
+            data, vehicle_data = self._call(self._shard_of(License_Plate), 'book', username, License_Plate,
+                                            start_date, end_date, customer.balance)
+            self.accounts.charge(username, float(data['total_cost']))
+            self._renting[username] = License_Plate
+        vehicle = Database._decode_vehicle(vehicle_data)
+        return Database._decode_rental(data, {username: customer}, {License_Plate: vehicle})
+
+    def return_vehicle(self, username: str) -> None:
+        with self._user_lock(username):
+            License_Plate = self._renting.get(username)
+            if License_Plate is None:
+                raise NoActiveRentalError(username)
+            self._call(self._shard_of(License_Plate), 'release', username)
+            del self._renting[username]
+
+    def add_vehicle(self, vehicle_data: Dict) -> Vehicle:
+        return Database._decode_vehicle(self._call(self._shard_of(vehicle_data['License_Plate']), 'add', vehicle_data))
+
+    def remove_vehicle(self, License_Plate: str) -> None:
+        self._call(self._shard_of(License_Plate), 'remove_vehicle', License_Plate)
+
+    def get_available_vehicles(self) -> List[Vehicle]:
+        return self._merge_available()
+
+    def find_available(self, start: datetime, end: datetime, filters: Optional[Dict[str, Any]] = None) -> List[Vehicle]:
+        return self._merge_available(start, end, filters)
+
+    def get_active_rentals(self) -> List[Rental]:
+        """Unreturned rentals across all shards, soonest end date first."""
+        rentals = []
+        for result in self._fan_out('active'):
+            for data, vehicle_data in result:
+                vehicle = Database._decode_vehicle(vehicle_data)
+                rentals.append(Database._decode_rental(data, {data['user']: self._customer(data['user'])},
+                                                       {vehicle.License_Plate: vehicle}))
+        rentals.sort(key=lambda r: (r.end_date, r.id))
+        return rentals
+
+    def shutdown(self):
+        # Closing the router's ends stops every shard thread; each shard then saves and exits
+        for pool in self._pools:
+            while not pool.empty():
+                pool.get().close()
+        for process in self._processes:
+            process.join()
+        self.accounts.shutdown()
+
+
+if __name__ == "__main__":
+    source, target, count = sys.argv[1], sys.argv[2], int(sys.argv[3])
+    split_data_dir(source, target, count)
+    print(f"Split {source} into {count} shards under {target}")
@@ -0,0 +1,256 @@
+import sqlite3
+import sys
+from datetime import datetime
+from typing import List, Dict, Optional
+
+from Backend import (AbstractUser, CarRentalSystem, Customer, Database, DatabaseError, Rental,
+                     Vehicle)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    password TEXT NOT NULL,
+    first_name TEXT NOT NULL,
+    last_name TEXT NOT NULL,
+    email TEXT NOT NULL,
+    phone TEXT NOT NULL,
+    address TEXT NOT NULL,
+    balance REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS vehicles (
+    license_plate TEXT PRIMARY KEY,
+    make TEXT NOT NULL,
+    model TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    daily_rate REAL NOT NULL,
+    seating INTEGER NOT NULL,
+    transmission TEXT NOT NULL,
+    fuel_type TEXT NOT NULL,
+    is_available INTEGER NOT NULL DEFAULT 1,
+    retired INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS rentals (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    username TEXT NOT NULL,
+    license_plate TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    end_date TEXT NOT NULL,
+    active INTEGER NOT NULL DEFAULT 1,
+    daily_rate REAL,
+    total_cost TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_vehicles_available ON vehicles (is_available);
+CREATE INDEX IF NOT EXISTS idx_rentals_user ON rentals (username);
+CREATE INDEX IF NOT EXISTS idx_rentals_vehicle ON rentals (license_plate);
+CREATE INDEX IF NOT EXISTS idx_rentals_active ON rentals (active);
+"""
+
+VEHICLE_COLUMNS = ("license_plate, make, model, year, daily_rate, seating, transmission, fuel_type, is_available, "
+                   "retired")
+RENTAL_COLUMNS = "id, username, license_plate, start_date, end_date, active, daily_rate, total_cost"
+# History rows carry their stored vehicle row, which is NULL for vehicles deleted before retirement existed
+HISTORY_COLUMNS = ", ".join([f"r.{c}" for c in RENTAL_COLUMNS.split(", ")] +
+                            [f"v.{c}" for c in VEHICLE_COLUMNS.split(", ")])
+
+
+class SQLiteDatabase(Database):
+    """SQLite storage engine with the same load/save surface as the JSON Database.
+
+    Each mutation recorded by CarRentalSystem is written in its own transaction, so
+    save_all has nothing left to write. Rentals are flagged active until returned, which
+    lets available vehicles and active rentals be queried without a full load.
+    Returned rentals stay in the database and are decoded a page at a time.
+    """
+
+    def __init__(self, system: Optional[CarRentalSystem], data_dir: str = 'data'):
+        super().__init__(system, data_dir)
+        self.db_file = self.data_dir / 'car_rental.db'
+        try:
+            # Callers sharing the system across threads serialize access to the connection
+            self.conn = sqlite3.connect(self.db_file, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.executescript(SCHEMA)
+            # Databases created before prices were frozen on rentals lack these columns
+            columns = {row[1] for row in self.conn.execute("PRAGMA table_info(rentals)")}
+            for column, column_type in (("daily_rate", "REAL"), ("total_cost", "TEXT")):
+                if column not in columns:
+                    self.conn.execute(f"ALTER TABLE rentals ADD COLUMN {column} {column_type}")
+            # Databases created before removed vehicles were retained lack this column
+            columns = {row[1] for row in self.conn.execute("PRAGMA table_info(vehicles)")}
+            if "retired" not in columns:
+                self.conn.execute("ALTER TABLE vehicles ADD COLUMN retired INTEGER NOT NULL DEFAULT 0")
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Failed to open {self.db_file.name}: {str(e)}")
+
+    def load_users(self) -> List[AbstractUser]:
+        rows = self.conn.execute(
+            "SELECT type, username, password, first_name, last_name, email, phone, address, balance FROM users")
+        return [self._user_from_row(row) for row in rows]
+
+    def load_vehicles(self) -> List[Vehicle]:
+        rows = self.conn.execute(f"SELECT {VEHICLE_COLUMNS} FROM vehicles")
+        return [self._vehicle_from_row(row) for row in rows]
+
+    def load_rentals(self) -> List[Rental]:
+        # Only active rentals are decoded up front; history is paged in by load_rental_history
+        users = {u.username: u for u in self.system.users if isinstance(u, Customer)}
+        vehicles = self._rental_vehicles()
+        rentals = []
+        for row in self.conn.execute(f"SELECT {RENTAL_COLUMNS} FROM rentals WHERE active = 1 ORDER BY seq"):
+            rental = self._decode_rental(self._rental_dict(row), users, vehicles)
+            rental.user.current_rental = rental
+            rentals.append(rental)
+        return rentals
+
+    def load_rental_history(self, user: Customer, offset: int = 0, limit: Optional[int] = None) -> List[Rental]:
+        rows = self.conn.execute(
+            f"SELECT {HISTORY_COLUMNS} FROM rentals r LEFT JOIN vehicles v ON v.license_plate = r.license_plate "
+            "WHERE r.username = ? AND r.active = 0 ORDER BY r.seq DESC LIMIT ? OFFSET ?",
+            (user.username, -1 if limit is None else limit, offset))
+        vehicles = self._rental_vehicles()
+        width = len(RENTAL_COLUMNS.split(", "))
+        history = []
+        for row in rows:
+            data = self._rental_dict(row[:width])
+            # Past rentals only need the car's description, so they decode without it being in the fleet
+            vehicle = vehicles.get(data['vehicle']) or self._history_vehicle(data, row[width:])
+            history.append(self._decode_rental(data, {user.username: user}, {vehicle.License_Plate: vehicle}))
+        return history
+
+    def save_all(self, users: List[AbstractUser], vehicles: List[Vehicle], rentals: List[Rental]):
+        # Every mutation was already committed by record(), so there is nothing to flush
+        pass
+
+    def record(self, entry: Dict):
+        self.record_many([entry])
+
+    def record_many(self, entries: List[Dict]):
+        # One transaction per batch, so a group of commits costs a single fsync
+        try:
+            with self.conn:
+                for entry in entries:
+                    self._apply(entry)
+        except sqlite3.Error as e:
+            ops = ', '.join(sorted({entry['op'] for entry in entries}))
+            raise DatabaseError(f"Failed to write {ops}: {str(e)}")
+
+    def _apply(self, entry: Dict):
+        op = entry['op']
+        if op == 'register':
+            self._insert_users([entry['user']])
+        elif op == 'rent':
+            rental = entry['rental']
+            self._insert_rentals([dict(rental, active=1)])
+            self.conn.execute("UPDATE users SET balance = ? WHERE username = ?",
+                              (entry['balance'], rental['user']))
+            self.conn.execute("UPDATE vehicles SET is_available = 0 WHERE license_plate = ?",
+                              (rental['vehicle'],))
+        elif op == 'return':
+            self.conn.execute("UPDATE rentals SET active = 0 WHERE id = ?", (entry['rental'],))
+            # A vehicle stays unavailable while it has other bookings outstanding
+            self.conn.execute(
+                "UPDATE vehicles SET is_available = NOT EXISTS (SELECT 1 FROM rentals "
+                "WHERE rentals.license_plate = vehicles.license_plate AND active = 1) "
+                "WHERE license_plate = (SELECT license_plate FROM rentals WHERE id = ?)", (entry['rental'],))
+        elif op == 'add_funds':
+            self.conn.execute("UPDATE users SET balance = ? WHERE username = ?",
+                              (entry['balance'], entry['user']))
+        elif op == 'add_vehicle':
+            self._insert_vehicles([entry['vehicle']])
+        elif op == 'remove_vehicle':
+            # Kept as retired so the rentals that reference it still load
+            self.conn.execute("UPDATE vehicles SET retired = 1, is_available = 0 WHERE license_plate = ?",
+                              (entry['License_Plate'],))
+
+    def import_all(self, users: List[AbstractUser], vehicles: List[Vehicle], rentals: List[Rental]):
+        active = {u.current_rental.id for u in users if isinstance(u, Customer) and u.current_rental}
+        try:
+            with self.conn:
+                self.conn.execute("DELETE FROM users")
+                self.conn.execute("DELETE FROM vehicles")
+                self.conn.execute("DELETE FROM rentals")
+                self._insert_users([self._encode_user(u) for u in users])
+                self._insert_vehicles([self._encode_vehicle(v) for v in vehicles])
+                self._insert_rentals([dict(self._encode_rental(r), active=int(r.id in active)) for r in rentals])
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Failed to import into {self.db_file.name}: {str(e)}")
+
+    def query_available_vehicles(self) -> List[Vehicle]:
+        rows = self.conn.execute(f"SELECT {VEHICLE_COLUMNS} FROM vehicles WHERE is_available = 1")
+        return [self._vehicle_from_row(row) for row in rows]
+
+    def query_active_rentals(self) -> List[Dict]:
+        rows = self.conn.execute(f"SELECT {RENTAL_COLUMNS} FROM rentals WHERE active = 1 ORDER BY seq")
+        return [self._rental_dict(row) for row in rows]
+
+    def close(self):
+        self.conn.close()
+
+    def _insert_users(self, users: List[Dict]):
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO users VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(u['username'], u['type'], u['password'], u['first_name'], u['last_name'], u['email'],
+              u['phone'], u['address'], u.get('balance', 0.0)) for u in users])
+
+    def _insert_vehicles(self, vehicles: List[Dict]):
+        self.conn.executemany(
+            f"INSERT OR REPLACE INTO vehicles ({VEHICLE_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(v['License_Plate'], v['make'], v['model'], v['year'], v['daily_rate'], v['seating'],
+              v['transmission'], v['fuel_type'], int(v['is_available']), int(v.get('retired', False)))
+             for v in vehicles])
+
+    def _insert_rentals(self, rentals: List[Dict]):
+        self.conn.executemany(
+            f"INSERT OR IGNORE INTO rentals ({RENTAL_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(r['id'], r['user'], r['vehicle'], self._iso(r['start_date']), self._iso(r['end_date']), r['active'],
+              r.get('daily_rate'), None if r.get('total_cost') is None else str(r['total_cost']))
+             for r in rentals])
+
+    @staticmethod
+    def _iso(value) -> str:
+        return value.isoformat() if isinstance(value, datetime) else value
+
+    def _user_from_row(self, row) -> AbstractUser:
+        user_type, username, password, first_name, last_name, email, phone, address, balance = row
+        return self._decode_user({
+            "type": user_type, "username": username, "password": password, "first_name": first_name,
+            "last_name": last_name, "email": email, "phone": phone, "address": address, "balance": balance
+        })
+
+    def _vehicle_from_row(self, row) -> Vehicle:
+        plate, make, model, year, daily_rate, seating, transmission, fuel_type, is_available, retired = row
+        return self._decode_vehicle({
+            "License_Plate": plate, "make": make, "model": model, "year": year, "daily_rate": daily_rate,
+            "seating": seating, "transmission": transmission, "fuel_type": fuel_type,
+            "is_available": bool(is_available), "retired": bool(retired)
+        })
+
+    def _history_vehicle(self, rental: Dict, row) -> Vehicle:
+        if row[0] is not None:
+            return self._vehicle_from_row(row)
+        # Only the plate survives a vehicle deleted by older versions; the rental keeps its own price
+        return Vehicle(License_Plate=rental['vehicle'], make="Removed vehicle", model="", year=2000,
+                       daily_rate=rental['daily_rate'] or 0.0, seating=0, transmission="", fuel_type="",
+                       is_available=False, retired=True)
+
+    @staticmethod
+    def _rental_dict(row) -> Dict:
+        rental_id, username, plate, start_date, end_date, active, daily_rate, total_cost = row
+        return {"id": rental_id, "user": username, "vehicle": plate, "start_date": start_date,
+                "end_date": end_date, "active": bool(active), "daily_rate": daily_rate, "total_cost": total_cost}
+
+
+def migrate_json_to_sqlite(data_dir: str = 'data') -> SQLiteDatabase:
+    """One-shot copy of users.json, vehicles.json and rentals.json into car_rental.db."""
+    system = CarRentalSystem(data_dir)
+    db = SQLiteDatabase(system, data_dir)
+    db.import_all(system.users, system._stored_vehicles(), system.rentals)
+    return db
+
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else 'data'
+    migrate_json_to_sqlite(target).close()
+    print(f"Migrated {target} to SQLite")